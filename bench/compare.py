@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from pathlib import Path
+import json
+
+import typer
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    baseline: Path = typer.Argument(..., help="Baseline result JSON"),
+    candidate: Path = typer.Argument(..., help="Candidate result JSON"),
+    threshold: float = typer.Option(0.10, help="Fail if any benchmark is slower by more than this fraction"),
+):
+    base = json.loads(baseline.read_text(encoding="utf-8"))
+    cand = json.loads(candidate.read_text(encoding="utf-8"))
+    if base.get("spec") != cand.get("spec"):
+        typer.echo(f"Warning: specs differ: {base.get('spec')} vs {cand.get('spec')}")
+
+    typer.echo(f"{'benchmark':<28} {base['commit']:>10} {cand['commit']:>10}   change")
+    regressions = []
+    for name, b in base["results"].items():
+        c = cand["results"].get(name)
+        if c is None:
+            continue
+        change = (c - b) / b if b > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  <-- regression"
+        typer.echo(f"{name:<28} {b:10.4f} {c:10.4f}  {change:+7.1%}{flag}")
+
+    if regressions:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
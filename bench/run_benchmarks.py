@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+import json
+import platform
+import subprocess
+import tempfile
+import time
+
+import pandas as pd
+import typer
+
+from synth import SCALES, SynthSpec, SyntheticPriceCache, generate, synthetic_prices
+
+from sharetracker.io.betashares_transactions import load_betashares_transactions
+from sharetracker.io.cmc_cash_summary import load_cmc_cash_transaction_summary
+from sharetracker.io.cmc_confirmation import load_cmc_confirmation
+from sharetracker.io.coinspot_orderhistory import load_coinspot_orderhistory
+from sharetracker.io.normalize import apply_symbol_map, sort_and_dedupe
+from sharetracker.portfolio.ledger import build_daily_holdings
+from sharetracker.pricing.router import PriceRouter
+from sharetracker.pricing.yahoo import PriceCache
+from sharetracker.reporting.tax_au import realized_gains_fifo
+from sharetracker.viz.charts import save_equity_curve_chart
+
+app = typer.Typer(add_completion=False)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _time(fn: Callable[[], object], repeat: int) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+@app.command()
+def main(
+    scale: str = typer.Option("small", help=f"Preset: {', '.join(SCALES)} (overridden by --rows/--symbols)"),
+    rows: int = typer.Option(None, help="Total synthetic rows across all exports"),
+    symbols: int = typer.Option(None, help="Number of distinct symbols"),
+    repeat: int = typer.Option(3, help="Repetitions per benchmark (best time is kept)"),
+    holdings_days: int = typer.Option(None, help="Limit build_daily_holdings to the last N days"),
+    out: Path = typer.Option(None, help="Result JSON path (default bench/results/<commit>-<scale>.json)"),
+    workdir: Path = typer.Option(None, help="Where to write synthetic CSVs (default: temp dir)"),
+):
+    n_rows, n_symbols = SCALES[scale]
+    spec = SynthSpec(rows=rows or n_rows, symbols=symbols or n_symbols)
+    tmp = tempfile.TemporaryDirectory() if workdir is None else None
+    root = Path(tmp.name) if tmp else workdir
+
+    results: dict[str, float] = {}
+    t0 = time.perf_counter()
+    paths = generate(root / "raw", spec)
+    results["generate"] = time.perf_counter() - t0
+
+    loaders = {
+        "cmc_cash": load_cmc_cash_transaction_summary,
+        "cmc_conf": load_cmc_confirmation,
+        "betashares": load_betashares_transactions,
+        "coinspot_orders": load_coinspot_orderhistory,
+    }
+    txs = []
+    for name, loader in loaders.items():
+        secs, loaded = _time(lambda: loader(str(paths[name])), repeat)
+        results[f"load.{name}"] = secs
+        txs += loaded
+
+    secs, txs = _time(lambda: sort_and_dedupe(apply_symbol_map(txs, {})), repeat)
+    results["normalize_dedupe"] = secs
+
+    start = spec.start
+    if holdings_days:
+        start = (pd.Timestamp(spec.end) - pd.Timedelta(days=holdings_days)).date().isoformat()
+    secs, holdings = _time(lambda: build_daily_holdings(txs, start=start, end=spec.end), 1)
+    results["build_daily_holdings"] = secs
+
+    secs, _ = _time(lambda: realized_gains_fifo(txs), repeat)
+    results["realized_gains_fifo"] = secs
+
+    # Price cache: seed parquet files from the stand-in provider, then time warm reads
+    # through the real cache and router.
+    tickers = [c for c in holdings.columns if c != "cash"]
+    cache = PriceCache(cache_dir=root / "price_cache")
+    cache.cache_dir.mkdir(parents=True, exist_ok=True)
+    for t in tickers:
+        synthetic_prices(t, start, spec.end).to_frame().to_parquet(cache.cache_path(t))
+    secs, _ = _time(lambda: cache.load_or_fetch_many(tickers, start, spec.end), repeat)
+    results["price_cache.warm_read"] = secs
+
+    router = PriceRouter(yahoo=SyntheticPriceCache(), coinspot=SyntheticPriceCache())
+    secs, px = _time(lambda: router.load_many(tickers, start, spec.end), repeat)
+    results["price_router.synthetic"] = secs
+
+    px = px.reindex(holdings.index).ffill()
+    equity = (holdings[tickers] * px[tickers]).sum(axis=1) + holdings["cash"]
+    curve = pd.concat([equity.rename("portfolio"), (equity * 0.9).rename("benchmark")], axis=1)
+    secs, _ = _time(lambda: save_equity_curve_chart(curve, root / "charts" / "equity.html", "bench"), repeat)
+    results["charts.equity_curve"] = secs
+
+    payload = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "spec": spec.__dict__,
+        "transactions": len(txs),
+        "days": len(holdings.index),
+        "results": results,
+    }
+    out = out or RESULTS_DIR / f"{payload['commit']}-{scale}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    for k, v in results.items():
+        typer.echo(f"{k:<28} {v:9.4f}s")
+    typer.echo(f"Wrote: {out}")
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    app()
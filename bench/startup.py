@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import typer
+
+from run_benchmarks import RESULTS_DIR, _git_commit
+
+app = typer.Typer(add_completion=False)
+
+# Entry points timed in a fresh interpreter, and modules each must not pull in at import time.
+TARGETS = {
+    "sharetracker.cli": ("pandas", "plotly", "yfinance"),
+    "sharetracker.pipeline.stages": ("plotly", "yfinance"),
+}
+
+
+def _importtime(module: str) -> dict[str, tuple[int, int]]:
+    # module -> (self us, cumulative us), from CPython's -X importtime report on stderr.
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    out: dict[str, tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if not parts[0].isdigit():
+            continue  # header row
+        out.setdefault(parts[2].strip(), (int(parts[0]), int(parts[1])))
+    return out
+
+
+def _wall(args: list[str]) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], capture_output=True, check=True)
+    return time.perf_counter() - t0
+
+
+@app.command()
+def main(
+    repeat: int = typer.Option(5, help="Repetitions per measurement (best time is kept)"),
+    top: int = typer.Option(10, help="Show this many slowest imports per target"),
+    out: Path = typer.Option(None, help="Result JSON path (default bench/results/<commit>-startup.json)"),
+):
+    results: dict[str, float] = {}
+    leaks: list[str] = []
+    for module, forbidden in TARGETS.items():
+        best: dict[str, tuple[int, int]] = {}
+        for _ in range(repeat):
+            report = _importtime(module)
+            if not best or report[module][1] < best[module][1]:
+                best = report
+        results[f"import.{module}"] = best[module][1] / 1e6
+        leaks += [f"{module} imports {m}" for m in forbidden if m in best]
+
+        typer.echo(f"{module}: {best[module][1] / 1e3:.1f} ms cumulative")
+        slowest = sorted(best.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+        for name, (self_us, _) in slowest:
+            typer.echo(f"  {self_us / 1e3:8.1f} ms  {name}")
+
+    results["cli.help"] = min(_wall(["-m", "sharetracker.cli", "--help"]) for _ in range(repeat))
+    typer.echo(f"sharetracker --help: {results['cli.help']:.3f}s")
+
+    payload = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "spec": {"startup": True},
+        "results": results,
+    }
+    out = out or RESULTS_DIR / f"{payload['commit']}-startup.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    typer.echo(f"Wrote: {out}")
+
+    if leaks:
+        for msg in leaks:
+            typer.echo(f"Warning: {msg} at import time")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import zlib
+
+import numpy as np
+import pandas as pd
+
+SCALES = {
+    "small": (10_000, 10),
+    "medium": (1_000_000, 500),
+    "large": (10_000_000, 5_000),
+}
+
+# Share of the requested rows written to each export.
+_SPLIT = {"cmc_cash": 0.2, "cmc_conf": 0.3, "betashares": 0.25, "coinspot_orders": 0.25}
+
+
+@dataclass
+class SynthSpec:
+    rows: int = 10_000
+    symbols: int = 10
+    start: str = "2015-01-01"
+    end: str = "2024-12-31"
+    seed: int = 7
+
+
+def _asx_codes(n: int) -> list[str]:
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    i = np.arange(n)
+    return ["".join(c) for c in zip(letters[i // 676 % 26], letters[i // 26 % 26], letters[i % 26])]
+
+
+def _coins(n: int) -> list[str]:
+    return [f"C{c}" for c in _asx_codes(n)]
+
+
+def _dates(rng: np.random.Generator, n: int, spec: SynthSpec) -> pd.DatetimeIndex:
+    lo = pd.Timestamp(spec.start).value // 10**9
+    hi = pd.Timestamp(spec.end).value // 10**9
+    secs = np.sort(rng.integers(lo, hi, size=n))
+    return pd.to_datetime(secs, unit="s")
+
+
+def _base_price(symbols: list[str]) -> np.ndarray:
+    return np.array([5.0 + zlib.crc32(s.encode()) % 200 for s in symbols], dtype=float)
+
+
+def _trades(rng: np.random.Generator, n: int, symbols: list[str], spec: SynthSpec) -> pd.DataFrame:
+    # Sells only ever bring a symbol's cumulative sold quantity up to half of what was bought
+    # on earlier days, so FIFO matching never runs short regardless of scale or of how
+    # same-day rows end up ordered once exports drop the time of day.
+    dts = _dates(rng, n, spec)
+    sym_idx = rng.integers(0, len(symbols), size=n)
+    is_buy = rng.random(n) < 0.65
+    qty = np.round(rng.lognormal(3.0, 1.0, size=n), 4)
+    price = np.round(_base_price(symbols)[sym_idx] * rng.lognormal(0.0, 0.2, size=n), 4)
+
+    df = pd.DataFrame({"dt": dts, "sym": sym_idx, "buy": is_buy, "qty": qty, "price": price})
+    df["day"] = df["dt"].dt.normalize()
+    df["bought"] = np.where(df["buy"], df["qty"], 0.0)
+    day_tot = df.groupby(["sym", "day"])["bought"].sum()
+    before = (day_tot.groupby(level=0).cumsum() - day_tot).rename("bought_before")
+    df = df.join(before, on=["sym", "day"])
+    target = (0.5 * df["bought_before"]).where(~df["buy"])
+    prev = target.groupby(df["sym"]).transform(lambda s: s.ffill().shift(fill_value=0.0))
+    df["qty"] = np.where(df["buy"], df["qty"], np.round((target - prev.fillna(0.0)).clip(lower=0.0), 6))
+    df = df[df["qty"] > 0].reset_index(drop=True)
+    df["symbol"] = np.array(symbols)[df["sym"].to_numpy()]
+    return df[["dt", "symbol", "buy", "qty", "price"]]
+
+
+def write_cmc_confirmation(path: Path, trades: pd.DataFrame) -> None:
+    n = len(trades)
+    brokerage = np.full(n, 10.0)
+    gst = np.full(n, 1.0)
+    consideration = trades["qty"] * trades["price"] + np.where(trades["buy"], 1, -1) * (brokerage + gst)
+    pd.DataFrame({
+        "Account Number": 504883,
+        "Account Name": "SYNTHETIC",
+        "AsxCode": trades["symbol"],
+        "Confirmation Number": np.arange(30_000_000, 30_000_000 + n),
+        "Order Type": np.where(trades["buy"], "Buy", "Sell"),
+        "As at Date": "",
+        "Trade Date": trades["dt"].dt.strftime("%Y-%m-%d"),
+        "Settlement Date": (trades["dt"] + pd.Timedelta(days=2)).dt.strftime("%Y-%m-%d"),
+        "Avg Price": trades["price"].map("{:.4f} ".format),
+        "Exch Rate": 1.0,
+        "Price": trades["price"],
+        "Quantity": trades["qty"],
+        "Brokerage": brokerage,
+        "GST": gst,
+        "Stampduty": 0.0,
+        "Application Fee": 0.0,
+        "OtherCharge": 0.0,
+        "Fee": 0.0,
+        "Discount": 0.0,
+        "Consideration": consideration.round(4),
+        "Reverse Confirmation Number": 0,
+    }).to_csv(path, index=False)
+
+
+def write_cmc_cash(path: Path, rng: np.random.Generator, n: int, spec: SynthSpec, codes: list[str]) -> None:
+    dts = _dates(rng, n, spec)
+    kind = rng.integers(0, 4, size=n)
+    amount = np.round(rng.lognormal(6.0, 1.2, size=n), 2)
+    code = np.array(codes)[rng.integers(0, len(codes), size=n)]
+    desc = np.select(
+        [kind == 0, kind == 1, kind == 2],
+        [
+            np.char.add(np.char.add("Sold 100 ", code.astype(str)), " @ 1.0000 AUD"),
+            np.char.add(code.astype(str), " DIV 0013"),
+            np.full(n, "Internal transfer in"),
+        ],
+        default="To Synthetic - Internal transfer",
+    )
+    credit = np.where(kind < 3, amount, np.nan)
+    debit = np.where(kind == 3, amount, np.nan)
+    pd.DataFrame({
+        "Date": dts.strftime("%d/%m/%Y"),
+        "Description": desc,
+        "Debit $": debit,
+        "Credit $": credit,
+        "Balance $": np.round(np.nancumsum(np.nan_to_num(credit) - np.nan_to_num(debit)), 2),
+    }).to_csv(path, index=False)
+
+
+def write_betashares(path: Path, trades: pd.DataFrame, rng: np.random.Generator, spec: SynthSpec) -> None:
+    gross = trades["qty"] * trades["price"]
+    rows = pd.DataFrame({
+        "Effective Date": trades["dt"].dt.strftime("%d/%m/%Y"),
+        "Activity Type": np.where(trades["buy"], "Buy", "Sell"),
+        "Gross": np.where(trades["buy"], -gross, gross),
+        "Symbol": trades["symbol"] + ":AU",
+        "Brokerage": "",
+        "Price": trades["price"].map("${:.2f}".format),
+        "Quantity": trades["qty"],
+    })
+    n_dep = max(1, len(trades) // 10)
+    deposits = pd.DataFrame({
+        "Effective Date": _dates(rng, n_dep, spec).strftime("%d/%m/%Y"),
+        "Activity Type": "Portfolio deposit",
+        "Gross": np.round(rng.lognormal(7.0, 0.5, size=n_dep), 2),
+        "Symbol": "",
+        "Brokerage": "",
+        "Price": "",
+        "Quantity": "",
+    })
+    out = pd.concat([rows, deposits], ignore_index=True)
+    out["Gross"] = pd.to_numeric(out["Gross"]).map(lambda x: f"-${-x:.4f}" if x < 0 else f"${x:.4f}")
+    out.to_csv(path, index=False)
+
+
+def write_coinspot(path: Path, trades: pd.DataFrame) -> None:
+    total = (trades["qty"] * trades["price"]).round(2)
+    fee = (total * 0.01).round(2)
+    pd.DataFrame({
+        "Transaction Date": trades["dt"].dt.strftime("%d/%m/%Y %I:%M %p"),
+        "Type": np.where(trades["buy"], "Buy", "Sell"),
+        "Market": trades["symbol"].str.replace("-AUD", "", regex=False) + "/AUD",
+        "Amount": trades["qty"],
+        "Rate inc. fee": trades["price"] * 1.01,
+        "Rate ex. fee": trades["price"],
+        "Fee": fee.map("{:.2f} AUD".format),
+        "Fee AUD (inc GST)": fee,
+        "GST AUD": (fee / 11).round(2),
+        "Total AUD": total,
+        "Total (inc GST)": total.map("{:.2f} AUD".format),
+    }).to_csv(path, index=False)
+
+
+def generate(out_dir: Path, spec: SynthSpec) -> dict[str, Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(spec.seed)
+    n_asx = max(1, spec.symbols // 2)
+    n_crypto = max(1, spec.symbols - n_asx)
+    asx = _asx_codes(n_asx)
+    coins = [f"{c}-AUD" for c in _coins(n_crypto)]
+    n = {k: max(1, int(spec.rows * f)) for k, f in _SPLIT.items()}
+
+    paths = {
+        "cmc_cash": out_dir / "CashTransactionSummary.csv",
+        "cmc_conf": out_dir / "Confirmation.csv",
+        "betashares": out_dir / "betashares-transactions.csv",
+        "coinspot_orders": out_dir / "orderhistory.csv",
+    }
+    write_cmc_cash(paths["cmc_cash"], rng, n["cmc_cash"], spec, asx)
+    write_cmc_confirmation(paths["cmc_conf"], _trades(rng, n["cmc_conf"], asx, spec))
+    write_betashares(paths["betashares"], _trades(rng, n["betashares"], asx, spec), rng, spec)
+    write_coinspot(paths["coinspot_orders"], _trades(rng, n["coinspot_orders"], coins, spec))
+    return paths
+
+
+def synthetic_prices(ticker: str, start: str, end: str) -> pd.Series:
+    # Deterministic per-ticker GBM on calendar days, so crypto and ASX tickers both resolve.
+    idx = pd.date_range(start, end, freq="D")
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    steps = rng.normal(0.0002, 0.015, size=len(idx))
+    base = _base_price([ticker.split(".")[0].split("-")[0]])[0]
+    return pd.Series(base * np.exp(np.cumsum(steps)), index=idx, name="close")
+
+
+@dataclass
+class SyntheticPriceCache:
+    # Local stand-in for PriceCache/CoinspotPriceCache: same interface, no network.
+    history_start: str = "2010-01-01"
+    history_end: str = "2030-12-31"
+
+    def load_or_fetch(self, ticker: str, start: str, end: str, refresh: bool = False) -> pd.Series:
+        # refresh is accepted for interface parity; synthetic prices are never cached.
+        s = synthetic_prices(ticker, self.history_start, self.history_end)
+        return s.loc[pd.to_datetime(start):pd.to_datetime(end)]
+
+    def load_or_fetch_many(
+        self, tickers: list[str], start: str, end: str, refresh: bool = False
+    ) -> dict[str, pd.Series]:
+        return {t: self.load_or_fetch(t, start, end, refresh=refresh) for t in dict.fromkeys(tickers)}
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-import subprocess
 import sys
 
+from sharetracker.cli import app
+
 def main() -> None:
-    # Pass-through args to the Typer CLI entrypoint.
-    cmd = [sys.executable, "-m", "sharetracker.cli"] + sys.argv[1:]
-    print("Running:", " ".join(cmd))
-    raise SystemExit(subprocess.call(cmd))
+    # Pass-through args to the Typer CLI in this interpreter; bare options mean the `run` command.
+    args = sys.argv[1:]
+    if not args or args[0].startswith("-"):
+        args = ["run"] + args
+    print("Running: sharetracker", " ".join(args))
+    app(args=args, prog_name="sharetracker")
 
 if __name__ == "__main__":
     main()
@@ -17,3 +17,76 @@ def beta_alpha(port_r: pd.Series, bench_r: pd.Series, rf_daily: float = 0.0) ->
     beta = cov / var if var != 0 else 0.0
     alpha = float(y.mean() - beta * x.mean())
     return {"beta": beta, "alpha_daily": alpha}
+
+
+def benchmark_returns(prices: pd.DataFrame, benchmarks: dict[str, dict[str, float]]) -> pd.DataFrame:
+    # Every benchmark (single ticker or fixed-weight blend, rebalanced daily) is a column of
+    # constituent returns @ weight matrix, so adding benchmarks is one more matrix column.
+    # A benchmark with a constituent that has no prices at all (e.g. a failed fetch) is
+    # dropped rather than having that leg count as zero returns.
+    priced = {t for t in prices.columns if prices[t].notna().any()}
+    kept = {}
+    for name, w in benchmarks.items():
+        missing = [t for t in w if t not in priced]
+        if missing:
+            print(f"Warning: Dropping benchmark {name}: no prices for {', '.join(missing)}")
+        else:
+            kept[name] = w
+    benchmarks = kept
+    constituents = sorted({t for w in benchmarks.values() for t in w})
+    r = prices.reindex(columns=constituents).pct_change().fillna(0.0).to_numpy(dtype=float)
+    wmat = np.zeros((len(constituents), len(benchmarks)))
+    pos = {t: i for i, t in enumerate(constituents)}
+    for j, w in enumerate(benchmarks.values()):
+        total = sum(w.values()) or 1.0
+        for t, x in w.items():
+            wmat[pos[t], j] = x / total
+    return pd.DataFrame(r @ wmat, index=prices.index, columns=list(benchmarks))
+
+
+def compare_benchmarks(
+    port_r: pd.Series, bench_r: pd.DataFrame, rf_daily: float = 0.0, periods_per_year: int = 252
+) -> pd.DataFrame:
+    df = pd.concat([port_r.rename("__portfolio__"), bench_r], axis=1).dropna()
+    names = list(bench_r.columns)
+    if df.shape[0] < 5:
+        return pd.DataFrame({"benchmark": names})
+
+    y = df["__portfolio__"].to_numpy(dtype=float) - rf_daily
+    x = df[names].to_numpy(dtype=float) - rf_daily
+    n = y.shape[0]
+
+    # Least squares of y on [1, x_k] for all k in one pass over the T x K matrix.
+    xc = x - x.mean(axis=0)
+    yc = y - y.mean()
+    sxx = (xc * xc).sum(axis=0)
+    sxy = xc.T @ yc
+    syy = float(yc @ yc)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = np.where(sxx > 0, sxy / sxx, 0.0)
+        alpha = y.mean() - beta * x.mean(axis=0)
+        corr = np.where((sxx > 0) & (syy > 0), sxy / np.sqrt(sxx * syy), 0.0)
+
+        active = y[:, None] - x
+        te = active.std(axis=0, ddof=1) * np.sqrt(periods_per_year)
+        ir = np.where(te > 0, active.mean(axis=0) * periods_per_year / te, 0.0)
+
+        up = x > 0
+        down = x < 0
+        up_n = up.sum(axis=0)
+        down_n = down.sum(axis=0)
+        up_capture = (up.T @ y / up_n) / ((x * up).sum(axis=0) / up_n)
+        down_capture = (down.T @ y / down_n) / ((x * down).sum(axis=0) / down_n)
+
+    return pd.DataFrame({
+        "benchmark": names,
+        "observations": n,
+        "beta": beta,
+        "alpha_daily": alpha,
+        "alpha_annual": alpha * periods_per_year,
+        "correlation": corr,
+        "tracking_error": te,
+        "information_ratio": ir,
+        "up_capture": up_capture,
+        "down_capture": down_capture,
+    })
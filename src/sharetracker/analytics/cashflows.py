@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from sharetracker.analytics.xirr import xirr
+from sharetracker.portfolio.models import Transaction, TxType
+
+# Cash lines that settle a trade or pay income are internal to the portfolio; everything
+# else on a CASH_IN/CASH_OUT line (deposits, withdrawals, transfers) is an external flow.
+_TRADE_NOTE_RE = re.compile(r"^\s*(SOLD|BGHT|BOUGHT|BUY|SELL)\b", re.IGNORECASE)
+_INCOME_NOTE_RE = re.compile(r"\b(DIV|DIVIDEND|DST|DISTRIBUTION|INTEREST)\b", re.IGNORECASE)
+
+PERIODS = ("M", "Q", "FY")
+
+
+def is_external_flow(t: Transaction) -> bool:
+    if t.type not in (TxType.CASH_IN, TxType.CASH_OUT):
+        return False
+    note = t.note or ""
+    return not (_TRADE_NOTE_RE.search(note) or _INCOME_NOTE_RE.search(note))
+
+
+def _day_positions(dts: list, index: pd.DatetimeIndex) -> np.ndarray:
+    # A transaction lands on the first valuation date at or after it, matching the
+    # `dt <= d` rule used by build_daily_holdings.
+    return index.searchsorted(pd.DatetimeIndex(dts), side="left")
+
+
+def external_flows(txs: list[Transaction], index: pd.DatetimeIndex) -> pd.Series:
+    ext = [t for t in txs if is_external_flow(t)]
+    out = np.zeros(len(index))
+    if ext:
+        pos = _day_positions([t.dt for t in ext], index)
+        amt = np.array([t.cash_amount for t in ext], dtype=float)
+        keep = pos < len(index)
+        np.add.at(out, pos[keep], amt[keep])
+    return pd.Series(out, index=index, name="external_flow")
+
+
+def symbol_flows(txs: list[Transaction], index: pd.DatetimeIndex, symbols: list[str]) -> pd.DataFrame:
+    # Money put into each holding: buys are positive, sale proceeds negative.
+    trades = [t for t in txs if t.symbol in symbols and t.type in (TxType.BUY, TxType.SELL)]
+    out = np.zeros((len(index), len(symbols)))
+    if trades:
+        col = {s: j for j, s in enumerate(symbols)}
+        pos = _day_positions([t.dt for t in trades], index)
+        cols = np.array([col[t.symbol] for t in trades])
+        amt = -np.array([t.cash_amount for t in trades], dtype=float)
+        keep = pos < len(index)
+        np.add.at(out, (pos[keep], cols[keep]), amt[keep])
+    return pd.DataFrame(out, index=index, columns=symbols)
+
+
+def time_weighted_returns(equity: pd.Series, flows: pd.Series) -> pd.Series:
+    # Flows are assumed to arrive at the end of their day: r_t = (E_t - F_t) / E_{t-1} - 1.
+    e = equity.to_numpy(dtype=float)
+    f = flows.reindex(equity.index).fillna(0.0).to_numpy(dtype=float)
+    prev = np.concatenate([[np.nan], e[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.where(prev > 0, (e - f) / prev - 1.0, 0.0)
+    r = np.where(np.isfinite(r), r, 0.0)
+    r[0] = 0.0
+    return pd.Series(r, index=equity.index, name=equity.name)
+
+
+def _years(index: pd.DatetimeIndex) -> np.ndarray:
+    return (index - index[0]).days.to_numpy(dtype=float) / 365.0
+
+
+def money_weighted_returns(values: pd.DataFrame, flows: pd.DataFrame) -> pd.Series:
+    # Annualised XIRR per column. Investor cash flows are the starting value paid in,
+    # every later flow, and the closing value received; all columns are solved together.
+    v = values.to_numpy(dtype=float)
+    f = flows.reindex(index=values.index, columns=values.columns).fillna(0.0).to_numpy(dtype=float)
+    cf = -f.copy()
+    cf[0, :] = -v[0, :]
+    cf[-1, :] += v[-1, :]
+    irr = xirr(cf.T, _years(values.index))
+    return pd.Series(irr, index=values.columns, name="mwr")
+
+
+def _period_labels(index: pd.DatetimeIndex, period: str) -> np.ndarray:
+    if period == "FY":
+        fy = index.year + (index.month >= 7).astype(int)
+        return np.array([f"FY{y}" for y in fy])
+    return index.to_period(period).astype(str).to_numpy()
+
+
+def period_returns(equity: pd.Series, flows: pd.Series, period: str) -> pd.DataFrame:
+    if period not in PERIODS:
+        raise ValueError(f"Unsupported period: {period}")
+    index = equity.index
+    twr = time_weighted_returns(equity, flows)
+    labels = _period_labels(index, period)
+
+    # Contiguous runs of the same label give each period's [first, last] positions.
+    change = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    first = change
+    last = np.r_[change[1:] - 1, len(index) - 1]
+    growth = np.multiply.reduceat(1.0 + twr.to_numpy(), first) - 1.0
+
+    # One cash-flow row per period on the shared date axis, so a single xirr call
+    # solves every period: -V(start), -flows inside the period, +V(end).
+    start = np.maximum(first - 1, 0)
+    e = equity.to_numpy(dtype=float)
+    f = flows.reindex(index).fillna(0.0).to_numpy(dtype=float)
+    j = np.arange(len(index))
+    inside = (j[None, :] > start[:, None]) & (j[None, :] <= last[:, None])
+    cf = np.where(inside, -f[None, :], 0.0)
+    rows = np.arange(len(first))
+    cf[rows, start] -= e[start]
+    cf[rows, last] += e[last]
+    t = _years(index)
+    irr = xirr(cf, t)
+    span = t[last] - t[start]
+    with np.errstate(invalid="ignore"):
+        mwr = np.where(span > 0, (1.0 + irr) ** span - 1.0, np.nan)
+
+    return pd.DataFrame({
+        "period_type": period,
+        "period": labels[first],
+        "start": index[start].date,
+        "end": index[last].date,
+        "twr": growth,
+        "mwr": mwr,
+        "mwr_annualized": irr,
+    })
+
+
+def period_returns_table(equity: pd.Series, flows: pd.Series, periods: tuple[str, ...] = PERIODS) -> pd.DataFrame:
+    return pd.concat([period_returns(equity, flows, p) for p in periods], ignore_index=True)
@@ -31,11 +31,18 @@ def max_drawdown(equity: pd.Series) -> float:
     return float(dd.min())
 
 
-def summary_stats(equity: pd.Series, rf: float = 0.0) -> dict[str, float]:
-    r = returns_from_equity(equity)
+def summary_stats(equity: pd.Series, rf: float = 0.0, returns: pd.Series | None = None) -> dict[str, float]:
+    # Pass cash-flow-adjusted `returns` when the equity curve includes deposits/withdrawals;
+    # drawdown is then measured on the growth of $1 rather than on raw equity.
+    if returns is None:
+        r = returns_from_equity(equity)
+        curve = equity
+    else:
+        r = returns
+        curve = (1.0 + returns).cumprod()
     return {
         "ann_return": annualized_return(r),
         "ann_vol": annualized_vol(r),
         "sharpe": sharpe(r, rf=rf),
-        "max_drawdown": max_drawdown(equity),
+        "max_drawdown": max_drawdown(curve),
     }
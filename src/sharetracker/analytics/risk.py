@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+HORIZONS = (1, 10, 252)
+CONFIDENCES = (0.95, 0.99)
+
+
+@dataclass
+class SimulationResult:
+    horizons: tuple[int, ...]
+    terminal: np.ndarray  # paths x horizons, simple return over each horizon
+    drawdown: np.ndarray  # paths x horizons, worst drawdown seen within each horizon
+
+
+def current_weights(market_values: pd.DataFrame) -> pd.Series:
+    # Last row of the persisted valuation matrix; cash is part of the denominator but
+    # carries no return.
+    last = market_values.iloc[-1].fillna(0.0)
+    total = float(last.sum())
+    if total <= 0:
+        raise ValueError("Portfolio value on the last valuation date is not positive")
+    return last.drop(labels=["cash"], errors="ignore") / total
+
+
+def portfolio_daily_returns(prices: pd.DataFrame, w: pd.Series) -> np.ndarray:
+    # Bootstrapping whole rows keeps the joint (cross-asset) structure of each day; with
+    # constant weights the portfolio return of a sampled day is just that row @ w.
+    held = w[w != 0]
+    r = prices.reindex(columns=held.index).pct_change().iloc[1:]
+    r = r.replace([np.inf, -np.inf], np.nan).fillna(0.0)
+    return r.to_numpy(dtype=float) @ held.to_numpy(dtype=float)
+
+
+def _simulate_chunk(
+    port_r: np.ndarray, n_paths: int, horizons: tuple[int, ...], block: int, seed: np.random.SeedSequence
+) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    length = max(horizons)
+    block = max(1, min(block, port_r.shape[0]))
+    n_blocks = -(-length // block)
+    starts = rng.integers(0, port_r.shape[0] - block + 1, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :length]
+
+    log_wealth = np.cumsum(np.log1p(port_r[idx]), axis=1)
+    wealth = np.exp(log_wealth)
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=1), 1.0)
+    drawdown = np.minimum.accumulate(np.minimum(wealth / peak - 1.0, 0.0), axis=1)
+
+    cols = np.array(horizons) - 1
+    return wealth[:, cols] - 1.0, drawdown[:, cols]
+
+
+def simulate(
+    port_r: np.ndarray,
+    n_paths: int = 200_000,
+    horizons: tuple[int, ...] = HORIZONS,
+    block: int = 10,
+    seed: int = 42,
+    chunk_size: int = 20_000,
+    workers: int | None = None,
+) -> SimulationResult:
+    if port_r.shape[0] < 2:
+        raise ValueError("Need at least two days of returns to bootstrap")
+
+    # Seeds are spawned per chunk, so results do not depend on the worker count. Only the
+    # per-path summaries are kept, so memory is bounded by chunk_size x max(horizons).
+    sizes = [min(chunk_size, n_paths - i) for i in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    terminal = np.empty((n_paths, len(horizons)))
+    drawdown = np.empty((n_paths, len(horizons)))
+    args = [(port_r, n, tuple(horizons), block, s) for n, s in zip(sizes, seeds)]
+
+    if workers == 1 or len(sizes) == 1:
+        results = (_simulate_chunk(*a) for a in args)
+        _accumulate(results, sizes, terminal, drawdown)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_simulate_chunk, *zip(*args))
+            _accumulate(results, sizes, terminal, drawdown)
+
+    return SimulationResult(tuple(horizons), terminal, drawdown)
+
+
+def _accumulate(results, sizes: list[int], terminal: np.ndarray, drawdown: np.ndarray) -> None:
+    offset = 0
+    for n, (t, d) in zip(sizes, results):
+        terminal[offset:offset + n] = t
+        drawdown[offset:offset + n] = d
+        offset += n
+
+
+def risk_table(
+    result: SimulationResult, portfolio_value: float, confidences: tuple[float, ...] = CONFIDENCES
+) -> pd.DataFrame:
+    rows = []
+    for j, h in enumerate(result.horizons):
+        t = result.terminal[:, j]
+        d = result.drawdown[:, j]
+        for c in confidences:
+            q = float(np.quantile(t, 1.0 - c))
+            tail = t[t <= q]
+            var = -q
+            cvar = -float(tail.mean()) if tail.size else var
+            rows.append({
+                "horizon_days": h,
+                "confidence": c,
+                "var_pct": var,
+                "cvar_pct": cvar,
+                "var_value": var * portfolio_value,
+                "cvar_value": cvar * portfolio_value,
+                "drawdown_median": float(np.median(d)),
+                "drawdown_at_confidence": float(np.quantile(d, 1.0 - c)),
+                "paths": t.size,
+            })
+    return pd.DataFrame(rows)
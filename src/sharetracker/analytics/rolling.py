@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WINDOWS = (21, 63, 126, 252)
+
+
+def _prefix(x: np.ndarray) -> np.ndarray:
+    return np.concatenate([[0.0], np.cumsum(x)])
+
+
+def _window_sums(c: np.ndarray, w: int) -> np.ndarray:
+    # Rolling sum of every length-w window from a prefix-sum array: c[t+1] - c[t+1-w].
+    n = c.shape[0] - 1
+    out = np.full(n, np.nan)
+    if w <= n:
+        out[w - 1:] = c[w:] - c[:-w]
+    return out
+
+
+def _rolling_max(x: np.ndarray, w: int) -> np.ndarray:
+    # O(n) block scheme (van Herk/Gil-Werman): running max forward and backward inside
+    # blocks of length w; every window spans at most two blocks, so its max is
+    # max(backward[start], forward[end]).
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if w > n:
+        return out
+    pad = (-n) % w
+    blocks = np.concatenate([x, np.full(pad, -np.inf)]).reshape(-1, w)
+    fwd = np.maximum.accumulate(blocks, axis=1).ravel()[:n]
+    bwd = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+    out[w - 1:] = np.maximum(bwd[: n - w + 1], fwd[w - 1:])
+    return out
+
+
+def rolling_metrics(
+    port_r: pd.Series,
+    bench_r: pd.Series | None = None,
+    windows: tuple[int, ...] | list[int] = DEFAULT_WINDOWS,
+    rf: float = 0.0,
+    periods_per_year: int = 252,
+) -> pd.DataFrame:
+    if any(w < 2 for w in windows):
+        raise ValueError(f"Rolling windows must be at least 2 periods (sample variance): {list(windows)}")
+    idx = port_r.index
+    rf_daily = (1.0 + rf) ** (1.0 / periods_per_year) - 1.0
+    y = port_r.fillna(0.0).to_numpy(dtype=float) - rf_daily
+    x = None
+    if bench_r is not None:
+        x = bench_r.reindex(idx).fillna(0.0).to_numpy(dtype=float) - rf_daily
+
+    # Prefix sums do not depend on the window, so they are built once and every extra
+    # window only costs a handful of vector subtractions.
+    cy, cyy = _prefix(y), _prefix(y * y)
+    cdown = _prefix(np.minimum(y, 0.0) ** 2)
+    if x is not None:
+        cx, cxx, cxy = _prefix(x), _prefix(x * x), _prefix(x * y)
+    wealth = np.cumprod(1.0 + port_r.fillna(0.0).to_numpy(dtype=float))
+    ann = np.sqrt(periods_per_year)
+
+    cols: dict[str, np.ndarray] = {}
+    n = len(idx)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for w in windows:
+            valid = np.arange(n) >= w - 1
+            sy = _window_sums(cy, w)
+            syy = _window_sums(cyy, w)
+            mean_y = sy / w
+            var_y = (syy - w * mean_y**2) / (w - 1)
+            vol_y = np.sqrt(np.clip(var_y, 0.0, None))
+            dd_dev = np.sqrt(_window_sums(cdown, w) / w)
+
+            cols[f"vol_{w}d"] = vol_y * ann
+            cols[f"sharpe_{w}d"] = np.where(vol_y > 0, mean_y / vol_y * ann, 0.0)
+            cols[f"sortino_{w}d"] = np.where(dd_dev > 0, mean_y / dd_dev * ann, 0.0)
+            cols[f"drawdown_{w}d"] = wealth / _rolling_max(wealth, w) - 1.0
+
+            if x is not None:
+                sx = _window_sums(cx, w)
+                sxx = _window_sums(cxx, w)
+                sxy = _window_sums(cxy, w)
+                mean_x = sx / w
+                cov = (sxy - w * mean_x * mean_y) / (w - 1)
+                var_x = (sxx - w * mean_x**2) / (w - 1)
+                beta = np.where(var_x > 0, cov / var_x, 0.0)
+                denom = np.sqrt(np.clip(var_x, 0.0, None) * np.clip(var_y, 0.0, None))
+                cols[f"beta_{w}d"] = beta
+                cols[f"alpha_daily_{w}d"] = mean_y - beta * mean_x
+                cols[f"correlation_{w}d"] = np.where(denom > 0, cov / denom, 0.0)
+
+            for k in [k for k in cols if k.endswith(f"_{w}d")]:
+                cols[k] = np.where(valid, cols[k], np.nan)
+
+    return pd.DataFrame(cols, index=idx)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def _npv_and_deriv(cashflows: np.ndarray, times: np.ndarray, rate: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # NPV_k(r) = sum_n c_kn (1 + r_k)^-t_n, evaluated for every row k at once.
+    log_v = np.log1p(rate)[:, None]
+    disc = np.exp(-times[None, :] * log_v)
+    npv = (cashflows * disc).sum(axis=1)
+    d_npv = (-times[None, :] * cashflows * disc).sum(axis=1) / (1.0 + rate)
+    return npv, d_npv
+
+
+def xirr(
+    cashflows: np.ndarray,
+    times: np.ndarray,
+    guess: float = 0.1,
+    lo: float = -0.9999,
+    hi: float = 1e4,
+    tol: float = 1e-10,
+    max_iter: int = 200,
+) -> np.ndarray:
+    # Annualised IRR for every row of `cashflows` (k x n) on a shared time axis in years.
+    # Safeguarded Newton: each row keeps a sign-change bracket and bisects whenever the Newton
+    # step leaves it, so all rows converge in one batched loop. Rows without a sign change
+    # (or with non-finite flows) return NaN.
+    cf = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    t = np.asarray(times, dtype=float)
+    k = cf.shape[0]
+    out = np.full(k, np.nan)
+    if k == 0 or t.size == 0:
+        return out
+
+    finite = np.isfinite(cf).all(axis=1)
+    scale = np.where(finite, np.abs(np.nan_to_num(cf)).max(axis=1), 0.0)
+    ok = finite & (scale > 0) & (cf > 0).any(axis=1) & (cf < 0).any(axis=1)
+    if not ok.any():
+        return out
+
+    cf = cf[ok] / scale[ok, None]
+    a = np.full(cf.shape[0], lo)
+    b = np.full(cf.shape[0], hi)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        f_a, _ = _npv_and_deriv(cf, t, a)
+        f_b, _ = _npv_and_deriv(cf, t, b)
+        bracketed = np.sign(f_a) != np.sign(f_b)
+
+        r = np.clip(np.full(cf.shape[0], guess), a, b)
+        for _ in range(max_iter):
+            f, df = _npv_and_deriv(cf, t, r)
+            same = np.sign(f) == np.sign(f_a)
+            a = np.where(same, r, a)
+            f_a = np.where(same, f, f_a)
+            b = np.where(same, b, r)
+
+            step = r - f / df
+            inside = np.isfinite(step) & (step > a) & (step < b)
+            r_new = np.where(inside, step, 0.5 * (a + b))
+            done = np.abs(r_new - r) <= tol * (1.0 + np.abs(r))
+            r = r_new
+            if done[bracketed].all():
+                break
+
+    out[np.flatnonzero(ok)] = np.where(bracketed, r, np.nan)
+    return out
@@ -1,22 +1,13 @@
 from __future__ import annotations
 
 from datetime import datetime
-import pandas as pd
 import typer
 
+from sharetracker import profiling
 from sharetracker.config import load_config
-from sharetracker.io.cmc_cash_summary import load_cmc_cash_transaction_summary
-from sharetracker.io.cmc_confirmation import load_cmc_confirmation
-from sharetracker.io.betashares_transactions import load_betashares_transactions
-from sharetracker.io.coinspot_orderhistory import load_coinspot_orderhistory
-from sharetracker.io.normalize import apply_symbol_map, sort_and_dedupe, to_dataframe
-from sharetracker.pricing.coinspot import CoinspotPriceCache
-from sharetracker.pricing.yahoo import PriceCache
-from sharetracker.portfolio.ledger import build_daily_holdings
-from sharetracker.analytics.performance import summary_stats, returns_from_equity
-from sharetracker.analytics.benchmark import beta_alpha
-from sharetracker.reporting.tax_au import realized_gains_fifo, realized_to_tax_table
-from sharetracker.viz.charts import save_equity_curve_chart, save_drawdown_chart
+
+# pandas, the pipeline and the analytics modules are imported inside each command so that
+# `--help` and argument errors return without paying for them.
 
 app = typer.Typer(no_args_is_help=True)
 
@@ -30,96 +21,144 @@ def run(
     cmc_conf: str = typer.Option(None, help="CMC Confirmation CSV path"),
     betashares: str = typer.Option(None, help="Betashares transactions CSV path"),
     coinspot_orders: str = typer.Option(None, help="CoinSpot orderhistory CSV path"),
+    only: str = typer.Option(None, help="Comma-separated stages to re-run (upstream reused from cache)"),
+    from_stage: str = typer.Option(None, "--from", help="Re-run this stage and everything downstream"),
+    force: bool = typer.Option(False, help="Ignore the stage cache and re-run everything"),
+    profile: bool = typer.Option(False, help="Record per-stage timings, peak memory and counters (runs sequentially)"),
+    workers: int = typer.Option(None, help="Stages/charts run concurrently (default from config, 1 = sequential)"),
 ):
+    from sharetracker.pipeline.stages import RunContext, build_pipeline
+
     cfg = load_config(config)
     end = end or datetime.today().date().isoformat()
+    if workers:
+        cfg.max_workers = workers
+    if profile:
+        # tracemalloc's peak and process CPU time are process-wide, and chart workers run
+        # in other processes, so per-stage numbers are only meaningful run sequentially.
+        cfg.max_workers = 1
 
     cfg.processed_dir.mkdir(parents=True, exist_ok=True)
     (cfg.outputs_dir / "reports").mkdir(parents=True, exist_ok=True)
     (cfg.outputs_dir / "charts").mkdir(parents=True, exist_ok=True)
 
-    # 1) Ingest
-    txs = []
-    if cmc_cash:
-        txs += load_cmc_cash_transaction_summary(cmc_cash)
-    if cmc_conf:
-        txs += load_cmc_confirmation(cmc_conf)
-    if betashares:
-        txs += load_betashares_transactions(betashares)
-    if coinspot_orders:
-        txs += load_coinspot_orderhistory(coinspot_orders)
-
-    # 2) Normalize
-    txs = apply_symbol_map(txs, cfg.symbol_map)
-    txs = sort_and_dedupe(txs)
-    tx_df = to_dataframe(txs)
-    tx_df.to_csv(cfg.processed_dir / "transactions_normalized.csv", index=False)
-
-    # 3) Daily holdings
-    holdings = build_daily_holdings(txs, start=start, end=end)
-
-    # 4) Pricing (Yahoo)
-    tickers = [c for c in holdings.columns if c != "cash"]
-    yahoo_cache = PriceCache(cache_dir=cfg.processed_dir / "price_cache")
-    coinspot_cache = CoinspotPriceCache(
-        cache_dir=cfg.processed_dir / "price_cache",
-        history_url_template=cfg.coinspot_history_url_template,
-        latest_url=cfg.coinspot_latest_url,
-        api_key=cfg.coinspot_api_key,
-        api_key_header=cfg.coinspot_api_key_header,
-        timeout_seconds=cfg.coinspot_timeout_seconds,
+    ctx = RunContext(
+        cfg=cfg,
+        start=start,
+        end=end,
+        sources={
+            "cmc_cash": cmc_cash,
+            "cmc_conf": cmc_conf,
+            "betashares": betashares,
+            "coinspot_orders": coinspot_orders,
+        },
+    )
+    pipeline = build_pipeline(ctx)
+    only_stages = [s.strip() for s in only.split(",") if s.strip()] if only else None
+    prof = profiling.enable() if profile else None
+    try:
+        with profiling.span("run"):
+            _, results = pipeline.run(
+                ctx, only=only_stages, from_stage=from_stage, force=force,
+                max_workers=cfg.max_workers,
+            )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    finally:
+        if prof is not None:
+            profiling.disable()
+
+    for r in results:
+        typer.echo(f"[{r.status:>7}] {r.name:<10} {r.seconds:7.3f}s" + (f"  {r.error}" if r.error else ""))
+    ran = {r.name for r in results if r.status == "ran"}
+    for s in pipeline.stages:
+        if s.name in ran:
+            for p in s.files(ctx):
+                typer.echo(f"Wrote: {p}")
+
+    if prof is not None:
+        prof.print_summary()
+        for p in prof.write(cfg.outputs_dir / "profile"):
+            typer.echo(f"Wrote: {p}")
+
+    if any(r.status == "failed" for r in results):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def risk(
+    config: str = typer.Option("configs/config.yml", help="Path to YAML config"),
+    paths: int = typer.Option(None, help="Number of simulated paths (default from config)"),
+    block_size: int = typer.Option(None, help="Bootstrap block length in trading days"),
+    seed: int = typer.Option(None, help="Random seed"),
+    workers: int = typer.Option(None, help="Process pool size (1 = run in-process)"),
+):
+    import pandas as pd
+    from sharetracker.analytics.risk import current_weights, portfolio_daily_returns, risk_table, simulate
+
+    cfg = load_config(config)
+    prices_path = cfg.processed_dir / "prices.parquet"
+    mv_path = cfg.processed_dir / "market_values.parquet"
+    if not (prices_path.exists() and mv_path.exists()):
+        raise typer.BadParameter(f"Missing {prices_path} or {mv_path}; run `sharetracker run` first")
+
+    mv = pd.read_parquet(mv_path)
+    w = current_weights(mv)
+    port_r = portfolio_daily_returns(pd.read_parquet(prices_path), w)
+    result = simulate(
+        port_r,
+        n_paths=paths or cfg.risk_paths,
+        block=block_size or cfg.risk_block_size,
+        seed=cfg.risk_seed if seed is None else seed,
+        chunk_size=cfg.risk_chunk_size,
+        workers=workers or cfg.risk_workers,
     )
+    table = risk_table(result, portfolio_value=float(mv.iloc[-1].fillna(0.0).sum()))
+
+    out = cfg.outputs_dir / "reports" / "risk_var.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(out, index=False)
+    typer.echo(f"Wrote: {out}")
+
+
+@app.command()
+def serve(
+    config: str = typer.Option("configs/config.yml", help="Path to YAML config"),
+    start: str = typer.Option("2024-07-01", help="Start date (YYYY-MM-DD)"),
+    end: str = typer.Option(None, help="End date (YYYY-MM-DD), default today (rolls over while serving)"),
+    cmc_cash: str = typer.Option(None, help="CMC CashTransactionSummary CSV path"),
+    cmc_conf: str = typer.Option(None, help="CMC Confirmation CSV path"),
+    betashares: str = typer.Option(None, help="Betashares transactions CSV path"),
+    coinspot_orders: str = typer.Option(None, help="CoinSpot orderhistory CSV path"),
+    host: str = typer.Option(None, help="Bind address (default from config)"),
+    port: int = typer.Option(None, help="Port (default from config)"),
+):
+    from sharetracker.pipeline.stages import RunContext
+    from sharetracker.service import Service, serve as serve_forever
 
-    base_ccy = cfg.base_currency.upper()
-    prices = {}
-    for t in tickers:
-        if t.endswith(f"-{base_ccy}"):
-            prices[t] = coinspot_cache.load_or_fetch(t, start=start, end=end)
-        else:
-            prices[t] = yahoo_cache.load_or_fetch(t, start=start, end=end)
-    px_df = pd.DataFrame(prices).reindex(holdings.index).ffill()
-    px_df.to_parquet(cfg.processed_dir / "prices.parquet")
-
-    # 5) Equity curve
-    equity = holdings["cash"].copy()
-    for t in tickers:
-        equity = equity + holdings[t] * px_df[t]
-    equity.name = "portfolio"
-
-    # 6) Benchmark curve
-    bench_px = yahoo_cache.load_or_fetch(cfg.benchmark_ticker, start=start, end=end).reindex(holdings.index).ffill()
-    bench_equity = (bench_px / bench_px.iloc[0]) * float(equity.iloc[0])
-    bench_equity.name = "benchmark"
-
-    # 7) Risk/return stats
-    port_stats = summary_stats(equity)
-    bench_stats = summary_stats(bench_equity)
-
-    port_r = returns_from_equity(equity)
-    bench_r = returns_from_equity(bench_equity)
-    ba = beta_alpha(port_r, bench_r)
-
-    stats_df = pd.DataFrame([{
-        **{f"portfolio_{k}": v for k, v in port_stats.items()},
-        **{f"benchmark_{k}": v for k, v in bench_stats.items()},
-        **ba,
-    }])
-    stats_df.to_csv(cfg.outputs_dir / "reports" / "performance_summary.csv", index=False)
-
-    # 8) AU FIFO CGT (BUY/SELL only)
-    realized = realized_gains_fifo(txs)
-    tax_df = realized_to_tax_table(realized)
-    tax_df.to_csv(cfg.outputs_dir / "reports" / "au_cgt_fifo.csv", index=False)
-
-    # 9) Charts
-    curve_df = pd.concat([equity, bench_equity], axis=1)
-    save_equity_curve_chart(curve_df, cfg.outputs_dir / "charts" / "equity_curve.html", "Equity curve vs benchmark")
-    save_drawdown_chart(equity, cfg.outputs_dir / "charts" / "drawdown.html", "Portfolio drawdown")
-
-    typer.echo(f"Wrote: {cfg.processed_dir / 'transactions_normalized.csv'}")
-    typer.echo(f"Wrote: {cfg.outputs_dir / 'reports' / 'performance_summary.csv'}")
-    typer.echo(f"Wrote: {cfg.outputs_dir / 'reports' / 'au_cgt_fifo.csv'}")
-    typer.echo(f"Wrote charts: {cfg.outputs_dir / 'charts'}")
+    cfg = load_config(config)
+    cfg.processed_dir.mkdir(parents=True, exist_ok=True)
+    (cfg.outputs_dir / "reports").mkdir(parents=True, exist_ok=True)
+    (cfg.outputs_dir / "charts").mkdir(parents=True, exist_ok=True)
+
+    ctx = RunContext(
+        cfg=cfg,
+        start=start,
+        end=end or datetime.today().date().isoformat(),
+        sources={
+            "cmc_cash": cmc_cash,
+            "cmc_conf": cmc_conf,
+            "betashares": betashares,
+            "coinspot_orders": coinspot_orders,
+        },
+    )
+    service = Service(
+        ctx,
+        fixed_end=end is not None,
+        poll_seconds=cfg.serve_poll_seconds,
+        price_refresh_minutes=cfg.serve_price_refresh_minutes,
+    )
+    serve_forever(service, host or cfg.serve_host, cfg.serve_port if port is None else port)
 
 
 if __name__ == "__main__":
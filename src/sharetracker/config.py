@@ -1,9 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import yaml
 
+OUTPUT_FORMATS = ("csv", "parquet", "both")
+# Must match the keys of pricing.coinspot.RESAMPLE_RULES (kept here so config stays pandas-free).
+COINSPOT_RESOLUTIONS = ("1h", "1d")
+
+
+class ConfigError(ValueError):
+    pass
+
 
 @dataclass
 class AppConfig:
@@ -19,12 +27,40 @@ class AppConfig:
     coinspot_history_url_template: str
     coinspot_latest_url: str | None
     coinspot_timeout_seconds: int
+    coinspot_resolutions: tuple[str, ...] = ("1d",)
+    rolling_windows: tuple[int, ...] = (21, 63, 126, 252)
+    # Per-series point budget for charts; longer series are downsampled with LTTB. 0 = off.
+    chart_max_points: int = 2000
+    # Static copies of each chart (png/svg/pdf) rendered via kaleido.
+    chart_static_formats: tuple[str, ...] = ()
+    # Stages that do not depend on each other (e.g. stats and CGT) run in this many threads;
+    # charts render in a process pool of the same size. 1 = everything sequential.
+    max_workers: int = 4
+    # csv | parquet | both; prices, market values, weights, contributions and rolling
+    # metrics are always parquet.
+    output_format: str = "csv"
+    asset_classes: dict[str, str] = field(default_factory=dict)
+    # name -> {ticker: weight}; single-ticker benchmarks have one weight of 1.0.
+    benchmarks: dict[str, dict[str, float]] = field(default_factory=dict)
+    risk_paths: int = 200_000
+    risk_block_size: int = 10
+    risk_seed: int = 42
+    risk_chunk_size: int = 20_000
+    risk_workers: int | None = None
+    serve_host: str = "127.0.0.1"
+    serve_port: int = 8765
+    serve_poll_seconds: float = 2.0
+    serve_price_refresh_minutes: float = 30.0
 
 
 def load_config(path: str) -> AppConfig:
     with open(path, "r", encoding="utf-8") as f:
         cfg = yaml.safe_load(f)
 
+    analytics_cfg = cfg.get("analytics", {}) or {}
+    charts_cfg = cfg.get("charts", {}) or {}
+    risk_cfg = cfg.get("risk", {}) or {}
+    serve_cfg = cfg.get("serve", {}) or {}
     coinspot_cfg = cfg.get("coinspot", {}) or {}
     secrets_path = coinspot_cfg.get("secrets_path", "configs/coinspot.private.yml")
     if secrets_path:
@@ -37,6 +73,36 @@ def load_config(path: str) -> AppConfig:
                 if isinstance(secrets_coinspot, dict):
                     coinspot_cfg = {**coinspot_cfg, **secrets_coinspot}
 
+    output_format = (cfg.get("outputs", {}) or {}).get("format", "csv")
+    if output_format not in OUTPUT_FORMATS:
+        raise ConfigError(f"Unknown outputs.format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+
+    resolutions = tuple(str(r) for r in (coinspot_cfg.get("resolutions", ["1d"]) or ["1d"]))
+    unknown = [r for r in resolutions if r not in COINSPOT_RESOLUTIONS]
+    if unknown:
+        raise ConfigError(
+            f"Unknown coinspot.resolutions: {unknown} (expected any of {', '.join(COINSPOT_RESOLUTIONS)})"
+        )
+
+    risk_workers = risk_cfg.get("workers")
+    if risk_workers is not None:
+        risk_workers = int(risk_workers)
+        if risk_workers < 1:
+            raise ConfigError(f"risk.workers must be at least 1 (or null for CPU count): {risk_workers}")
+
+    rolling_windows = tuple(int(w) for w in analytics_cfg.get("rolling_windows", [21, 63, 126, 252]))
+    if any(w < 2 for w in rolling_windows):
+        raise ConfigError(f"analytics.rolling_windows must all be at least 2: {list(rolling_windows)}")
+
+    benchmarks: dict[str, dict[str, float]] = {}
+    for b in cfg.get("benchmarks", []) or []:
+        if "weights" in b:
+            benchmarks[b["name"]] = {str(t): float(w) for t, w in b["weights"].items()}
+        else:
+            benchmarks[b.get("name", b["ticker"])] = {b["ticker"]: 1.0}
+    if not benchmarks:
+        benchmarks[cfg["benchmark"]["name"]] = {cfg["benchmark"]["ticker"]: 1.0}
+
     return AppConfig(
         base_currency=cfg.get("base_currency", "AUD"),
         timezone=cfg.get("timezone", "Australia/Sydney"),
@@ -56,4 +122,21 @@ def load_config(path: str) -> AppConfig:
             "https://www.coinspot.com.au/pubapi/latest",
         ),
         coinspot_timeout_seconds=int(coinspot_cfg.get("timeout_seconds", 30)),
+        coinspot_resolutions=resolutions,
+        rolling_windows=rolling_windows,
+        output_format=output_format,
+        chart_max_points=int(charts_cfg.get("max_points", 2000) or 0),
+        chart_static_formats=tuple(charts_cfg.get("static_formats", []) or []),
+        max_workers=max(1, int((cfg.get("reports", {}) or {}).get("max_workers", 4))),
+        asset_classes=cfg.get("asset_classes", {}) or {},
+        benchmarks=benchmarks,
+        risk_paths=int(risk_cfg.get("paths", 200_000)),
+        risk_block_size=int(risk_cfg.get("block_size", 10)),
+        risk_seed=int(risk_cfg.get("seed", 42)),
+        risk_chunk_size=int(risk_cfg.get("chunk_size", 20_000)),
+        risk_workers=risk_workers,
+        serve_host=serve_cfg.get("host", "127.0.0.1"),
+        serve_port=int(serve_cfg.get("port", 8765)),
+        serve_poll_seconds=float(serve_cfg.get("poll_seconds", 2.0)),
+        serve_price_refresh_minutes=float(serve_cfg.get("price_refresh_minutes", 30.0)),
     )
@@ -4,11 +4,13 @@ from datetime import datetime
 import pandas as pd
 
 from sharetracker.io.cleaners import money_to_float, to_float
+from sharetracker import profiling
 from sharetracker.portfolio.models import Transaction, TxType
 
 
 def load_betashares_transactions(path: str) -> list[Transaction]:
     df = pd.read_csv(path)
+    profiling.count("rows.betashares", len(df))
     txs: list[Transaction] = []
 
     for i, r in df.iterrows():
@@ -5,12 +5,14 @@ import io
 import pandas as pd
 
 from sharetracker.io.cleaners import read_text_safely, deellipsis, to_float
+from sharetracker import profiling
 from sharetracker.portfolio.models import Transaction, TxType
 
 
 def load_cmc_confirmation(path: str) -> list[Transaction]:
     raw = deellipsis(read_text_safely(path))
     df = pd.read_csv(io.StringIO(raw))
+    profiling.count("rows.cmc_conf", len(df))
 
     col_trade_date = "Trade Date" if "Trade Date" in df.columns else None
     col_side = "Order Type" if "Order Type" in df.columns else (
@@ -4,6 +4,7 @@ from datetime import datetime
 import pandas as pd
 
 from sharetracker.io.cleaners import money_to_float, to_float
+from sharetracker import profiling
 from sharetracker.portfolio.models import Transaction, TxType
 
 
@@ -18,6 +19,7 @@ def _coin_from_market(market: str) -> tuple[str, str]:
 
 def load_coinspot_orderhistory(path: str) -> list[Transaction]:
     df = pd.read_csv(path)
+    profiling.count("rows.coinspot_orders", len(df))
     txs: list[Transaction] = []
 
     for i, r in df.iterrows():
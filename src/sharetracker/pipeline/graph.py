@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+import hashlib
+import json
+import pickle
+import threading
+import time
+
+import sharetracker
+from sharetracker import profiling
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    # Any change to the package source invalidates every cached stage.
+    h = hashlib.sha256(sharetracker.__version__.encode())
+    root = Path(sharetracker.__file__).parent
+    for p in sorted(root.rglob("*.py")):
+        h.update(str(p.relative_to(root)).encode())
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+def file_digest(path: str | Path | None) -> str | None:
+    if not path:
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _hash_value(h: Any, v: Any) -> None:
+    # pandas objects are hashed by value: their pickles also carry lazily filled caches
+    # (e.g. DatetimeIndex unit), so equal frames can pickle to different bytes.
+    if isinstance(v, dict):
+        for k in sorted(v, key=repr):
+            h.update(repr(k).encode())
+            _hash_value(h, v[k])
+        return
+    if type(v).__module__.startswith("pandas"):
+        import pandas as pd
+
+        if isinstance(v, (pd.DataFrame, pd.Series)):
+            dtypes = v.dtypes if isinstance(v, pd.DataFrame) else [v.dtype]
+            meta = (type(v).__name__, getattr(v, "name", None), list(getattr(v, "columns", [])),
+                    [str(d) for d in dtypes], list(v.index.names), str(v.index.dtype))
+            try:
+                values = pd.util.hash_pandas_object(v, index=True).to_numpy().tobytes()
+            except TypeError:  # unhashable cells, e.g. lists
+                values = None
+            if values is not None:
+                h.update(repr(meta).encode())
+                h.update(values)
+                return
+    h.update(pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _digest(out: dict[str, Any]) -> str:
+    h = hashlib.sha256()
+    _hash_value(h, out)
+    return h.hexdigest()
+
+
+def _fingerprint(obj: Any) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any, dict[str, Any]], dict[str, Any]]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    # Files written as a side effect; a stage is re-run if any of them is missing.
+    files: Callable[[Any], list[Path]] = lambda ctx: []
+    # Config/params that affect this stage's result (JSON-serialisable).
+    params: Callable[[Any], Any] = lambda ctx: None
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # "ran" | "cached" | "failed" | "skipped"
+    seconds: float
+    key: str
+    error: str | None = None
+
+
+@dataclass
+class Pipeline:
+    stages: list[Stage]
+    cache_dir: Path
+    _producers: dict[str, Stage] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._producers = {}
+        for s in self.stages:
+            for o in s.outputs:
+                self._producers[o] = s
+            missing = [i for i in s.inputs if i not in self._producers]
+            if missing:
+                raise ValueError(f"Stage {s.name} depends on unknown or later outputs: {missing}")
+
+    def stage(self, name: str) -> Stage:
+        for s in self.stages:
+            if s.name == name:
+                return s
+        raise ValueError(f"Unknown stage: {name} (known: {', '.join(s.name for s in self.stages)})")
+
+    def _upstream(self, s: Stage) -> list[Stage]:
+        return list({self._producers[i].name: self._producers[i] for i in s.inputs}.values())
+
+    def _ancestors(self, names: set[str]) -> set[str]:
+        out = set(names)
+        todo = list(names)
+        while todo:
+            for u in self._upstream(self.stage(todo.pop())):
+                if u.name not in out:
+                    out.add(u.name)
+                    todo.append(u.name)
+        return out
+
+    def _descendants(self, name: str) -> set[str]:
+        out = {name}
+        for s in self.stages:
+            if any(u.name in out for u in self._upstream(s)):
+                out.add(s.name)
+        return out
+
+    def _manifest_path(self, s: Stage) -> Path:
+        return self.cache_dir / f"{s.name}.json"
+
+    def _artifact_path(self, s: Stage) -> Path:
+        return self.cache_dir / f"{s.name}.pkl"
+
+    def _read_manifest(self, s: Stage) -> dict[str, Any]:
+        m = self._manifest_path(s)
+        return json.loads(m.read_text(encoding="utf-8")) if m.exists() else {}
+
+    def _is_fresh(self, s: Stage, manifest: dict[str, Any], key: str, ctx: Any) -> bool:
+        if manifest.get("key") != key or not self._artifact_path(s).exists():
+            return False
+        return all(Path(p).exists() for p in s.files(ctx))
+
+    def run(
+        self,
+        ctx: Any,
+        only: list[str] | None = None,
+        from_stage: str | None = None,
+        force: bool = False,
+        max_workers: int = 1,
+    ) -> tuple[dict[str, Any], list[StageResult]]:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        forced: set[str] = set()
+        selected = {s.name for s in self.stages}
+        if only:
+            forced |= {self.stage(n).name for n in only}
+            selected = self._ancestors(forced)
+        if from_stage:
+            forced |= self._descendants(self.stage(from_stage).name) & selected
+        if force:
+            forced = set(selected)
+
+        # A stage's key covers the content digest of every upstream artifact (recorded in
+        # the upstream manifest when it was written), so a stage re-run under --only
+        # invalidates its descendants on the next run, and unchanged inputs are still
+        # detected without reading any cached artifact.
+        code = code_version()
+        digests: dict[str, str | None] = {}
+
+        artifacts: dict[str, Any] = {}
+        loaded: set[str] = set()
+        lock = threading.Lock()
+
+        def need(names: tuple[str, ...]) -> dict[str, Any]:
+            with lock:
+                for n in names:
+                    producer = self._producers[n]
+                    if n not in artifacts and producer.name not in loaded:
+                        with open(self._artifact_path(producer), "rb") as f:
+                            artifacts.update(pickle.load(f))
+                        loaded.add(producer.name)
+                return {n: artifacts[n] for n in names}
+
+        def execute(s: Stage, t0: float) -> StageResult:
+            manifest = self._read_manifest(s)
+            key = _fingerprint({
+                "stage": s.name,
+                "code": code,
+                "params": s.params(ctx),
+                "upstream": [digests[u.name] for u in self._upstream(s)],
+            })
+            if s.name not in forced and self._is_fresh(s, manifest, key, ctx):
+                digests[s.name] = manifest.get("digest")
+                return StageResult(s.name, "cached", time.perf_counter() - t0, key)
+
+            with profiling.span(f"stage.{s.name}"):
+                out = s.fn(ctx, need(s.inputs))
+            unknown = set(out) - set(s.outputs)
+            if unknown:
+                raise ValueError(f"Stage {s.name} returned undeclared outputs: {sorted(unknown)}")
+            with lock:
+                artifacts.update(out)
+                loaded.add(s.name)
+            self._artifact_path(s).write_bytes(pickle.dumps(out, protocol=pickle.HIGHEST_PROTOCOL))
+            digests[s.name] = _digest(out)
+            self._manifest_path(s).write_text(
+                json.dumps({"key": key, "digest": digests[s.name], "files": [str(p) for p in s.files(ctx)]}),
+                encoding="utf-8",
+            )
+            return StageResult(s.name, "ran", time.perf_counter() - t0, key)
+
+        def attempt(s: Stage) -> StageResult:
+            # Never raises: a failure is reported with the time the stage actually ran.
+            t0 = time.perf_counter()
+            try:
+                return execute(s, t0)
+            except Exception as exc:
+                return StageResult(
+                    s.name, "failed", time.perf_counter() - t0, "", error=f"{type(exc).__name__}: {exc}"
+                )
+
+        # Stages start as soon as their upstream stages finish, up to max_workers at once.
+        # A failing stage only takes its own descendants down; independent stages still run.
+        results: dict[str, StageResult] = {}
+        failed: set[str] = set()
+        pending = [s for s in self.stages if s.name in selected]
+
+        def skip_if_blocked(s: Stage) -> bool:
+            bad = [u.name for u in self._upstream(s) if u.name in failed]
+            if bad:
+                failed.add(s.name)
+                results[s.name] = StageResult(
+                    s.name, "skipped", 0.0, "", error=f"upstream failed: {', '.join(bad)}"
+                )
+            return bool(bad)
+
+        def finish(r: StageResult) -> None:
+            results[r.name] = r
+            if r.status == "failed":
+                failed.add(r.name)
+
+        if max_workers <= 1:
+            # Inline on the calling thread (stages are in dependency order), so profiling
+            # spans around run() see every stage's memory peak.
+            for s in pending:
+                if not skip_if_blocked(s):
+                    finish(attempt(s))
+            return artifacts, [results[s.name] for s in self.stages if s.name in results]
+
+        running: dict[Future, Stage] = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+            while pending or running:
+                for s in list(pending):
+                    if skip_if_blocked(s):
+                        pending.remove(s)
+                    elif all(u.name in results for u in self._upstream(s)) and len(running) < max_workers:
+                        pending.remove(s)
+                        running[pool.submit(attempt, s)] = s
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    running.pop(fut)
+                    finish(fut.result())
+
+        return artifacts, [results[s.name] for s in self.stages if s.name in results]
+
+    def load(self, names: tuple[str, ...]) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for s in {self._producers[n].name: self._producers[n] for n in names}.values():
+            with open(self._artifact_path(s), "rb") as f:
+                out.update(pickle.load(f))
+        return {n: out[n] for n in names}
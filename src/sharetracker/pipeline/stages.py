@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+import pandas as pd
+
+from sharetracker.config import AppConfig
+from sharetracker.io.cmc_cash_summary import load_cmc_cash_transaction_summary
+from sharetracker.io.cmc_confirmation import load_cmc_confirmation
+from sharetracker.io.betashares_transactions import load_betashares_transactions
+from sharetracker.io.coinspot_orderhistory import load_coinspot_orderhistory
+from sharetracker.io.normalize import apply_symbol_map, sort_and_dedupe, to_dataframe
+from sharetracker.pipeline.graph import Pipeline, Stage, file_digest
+from sharetracker.pricing.coinspot import CoinspotPriceCache
+from sharetracker.pricing.router import PriceRouter
+from sharetracker.pricing.yahoo import PriceCache
+from sharetracker.portfolio.ledger import build_daily_holdings
+from sharetracker.portfolio.valuation import (
+    attribution_by_class, attribution_by_symbol, class_contributions, contributions, equity_from_values,
+    market_values, weights,
+)
+from sharetracker.analytics.performance import summary_stats, returns_from_equity
+from sharetracker.analytics.benchmark import benchmark_returns, beta_alpha, compare_benchmarks
+from sharetracker.analytics.cashflows import (
+    external_flows, money_weighted_returns, period_returns_table, symbol_flows, time_weighted_returns,
+)
+from sharetracker.analytics.rolling import rolling_metrics
+from sharetracker.reporting.export import table_paths, write_parquet, write_table
+from sharetracker.reporting.tax_au import realized_gains_fifo, realized_to_tax_table
+from sharetracker.viz.charts import ChartJob, plotlyjs_path, render_charts
+
+LOADERS = {
+    "cmc_cash": load_cmc_cash_transaction_summary,
+    "cmc_conf": load_cmc_confirmation,
+    "betashares": load_betashares_transactions,
+    "coinspot_orders": load_coinspot_orderhistory,
+}
+
+
+@dataclass
+class RunContext:
+    cfg: AppConfig
+    start: str
+    end: str
+    sources: dict[str, str | None] = field(default_factory=dict)
+    # Refetch prices even where the caches cover the range (serve's scheduled reprice).
+    refresh_prices: bool = False
+
+    @property
+    def reports_dir(self) -> Path:
+        return self.cfg.outputs_dir / "reports"
+
+    @property
+    def charts_dir(self) -> Path:
+        return self.cfg.outputs_dir / "charts"
+
+
+def _ingest(name: str):
+    # One stage per broker export, so a changed file only reloads that export.
+    def fn(ctx: RunContext, _: dict[str, Any]) -> dict[str, Any]:
+        path = ctx.sources.get(name)
+        return {f"raw.{name}": LOADERS[name](path) if path else []}
+    return fn
+
+
+def _normalize(ctx: RunContext, a: dict[str, Any]) -> dict[str, Any]:
+    raw = [t for name in LOADERS for t in a[f"raw.{name}"]]
+    txs = apply_symbol_map(raw, ctx.cfg.symbol_map)
+    return {"txs": sort_and_dedupe(txs)}
+
+
+def _export_transactions(ctx: RunContext, a: dict[str, Any]) -> dict[str, Any]:
+    # A leaf stage of its own, so outputs.format never invalidates normalize's dependants.
+    write_table(to_dataframe(a["txs"]), ctx.cfg.processed_dir, "transactions_normalized", ctx.cfg.output_format)
+    return {}
+
+
+def _holdings(ctx: RunContext, a: dict[str, Any]) -> dict[str, Any]:
+    return {"holdings": build_daily_holdings(a["txs"], start=ctx.start, end=ctx.end)}
+
+
+def make_router(cfg: AppConfig) -> PriceRouter:
+    return PriceRouter(
+        yahoo=PriceCache(cache_dir=cfg.processed_dir / "price_cache"),
+        coinspot=CoinspotPriceCache(
+            cache_dir=cfg.processed_dir / "price_cache",
+            history_url_template=cfg.coinspot_history_url_template,
+            latest_url=cfg.coinspot_latest_url,
+            api_key=cfg.coinspot_api_key,
+            api_key_header=cfg.coinspot_api_key_header,
+            timeout_seconds=cfg.coinspot_timeout_seconds,
+            resolutions=cfg.coinspot_resolutions,
+        ),
+        base_currency=cfg.base_currency,
+    )
+
+
+def _pricing(ctx: RunContext, a: dict[str, Any]) -> dict[str, Any]:
+    # Holdings and benchmark constituents are priced in one batch.
+    cfg = ctx.cfg
+    holdings = a["holdings"]
+    tickers = [c for c in holdings.columns if c != "cash"]
+    bench_tickers = [cfg.benchmark_ticker] + [t for w in cfg.benchmarks.values() for t in w]
+    all_px = make_router(cfg).load_many(
+        tickers + bench_tickers, start=ctx.start, end=ctx.end, refresh=ctx.refresh_prices
+    )
+    all_px = all_px.reindex(holdings.index).ffill()
+    write_parquet(all_px[tickers], cfg.processed_dir / "prices.parquet", "prices", index=True)
+    return {"all_px": all_px}
+
+
+def _valuation(ctx: RunContext, a: dict[str, Any]) -> dict[str, Any]:
+    cfg = ctx.cfg
+    holdings = a["holdings"]
+    px_df = a["all_px"][[c for c in holdings.columns if c != "cash"]]
+
+    mv = market_values(holdings, px_df)
+    equity = equity_from_values(mv, holdings["cash"])
+    write_parquet(
+        mv.assign(cash=holdings["cash"]), cfg.processed_dir / "market_values.parquet", "market_values", index=True
+    )
+
+    w = weights(mv, equity)
+    contrib = contributions(mv, px_df, equity)
+    write_parquet(w, cfg.processed_dir / "weights.parquet", "weights", index=True)
+    write_parquet(contrib, cfg.processed_dir / "contributions.parquet", "contributions", index=True)
+    attr_symbol = attribution_by_symbol(mv, contrib, w, cfg.base_currency, cfg.asset_classes)
+    attr_class = attribution_by_class(attr_symbol)
+    write_table(attr_symbol, ctx.reports_dir, "attribution_by_symbol", cfg.output_format)
+    write_table(attr_class, ctx.reports_dir, "attribution_by_class", cfg.output_format)
+    return {"mv": mv, "equity": equity, "contrib": contrib}
+
+
+def _stats(ctx: RunContext, a: dict[str, Any]) -> dict[str, Any]:
+    cfg = ctx.cfg
+    txs, holdings, all_px, mv, equity = a["txs"], a["holdings"], a["all_px"], a["mv"], a["equity"]
+
+    bench_px = all_px[cfg.benchmark_ticker]
+    bench_equity = (bench_px / bench_px.iloc[0]) * float(equity.iloc[0])
+    bench_equity.name = "benchmark"
+
+    # Time-weighted, so deposits/withdrawals are not counted as returns.
+    flows = external_flows(txs, holdings.index)
+    port_r = time_weighted_returns(equity, flows)
+    bench_r = returns_from_equity(bench_equity)
+
+    port_stats = summary_stats(equity, returns=port_r)
+    bench_stats = summary_stats(bench_equity)
+    ba = beta_alpha(port_r, bench_r)
+
+    values = mv.assign(portfolio=equity)
+    mwr_flows = symbol_flows(txs, holdings.index, list(mv.columns))
+    mwr_flows["portfolio"] = flows
+    mwr = money_weighted_returns(values, mwr_flows)
+    write_table(mwr.rename_axis("name").reset_index(), ctx.reports_dir, "mwr_by_holding", cfg.output_format)
+
+    stats_df = pd.DataFrame([{
+        **{f"portfolio_{k}": v for k, v in port_stats.items()},
+        "portfolio_mwr": mwr["portfolio"],
+        **{f"benchmark_{k}": v for k, v in bench_stats.items()},
+        **ba,
+    }])
+    write_table(stats_df, ctx.reports_dir, "performance_summary", cfg.output_format)
+
+    bench_cmp = compare_benchmarks(port_r, benchmark_returns(all_px, cfg.benchmarks))
+    write_table(bench_cmp, ctx.reports_dir, "benchmark_comparison", cfg.output_format)
+
+    period_df = period_returns_table(equity, flows)
+    write_table(period_df, ctx.reports_dir, "returns_by_period", cfg.output_format)
+
+    curve = pd.concat([equity.rename("portfolio"), bench_equity], axis=1).rename_axis("date")
+    write_table(curve, ctx.reports_dir, "equity_curve", cfg.output_format, index=True)
+
+    rolling_df = rolling_metrics(port_r, bench_r, windows=cfg.rolling_windows)
+    write_parquet(rolling_df, ctx.reports_dir / "rolling_metrics.parquet", "rolling_metrics", index=True)
+    return {"bench_equity": bench_equity, "port_r": port_r, "rolling": rolling_df, "stats": stats_df}
+
+
+def _cgt(ctx: RunContext, a: dict[str, Any]) -> dict[str, Any]:
+    # AU FIFO CGT (BUY/SELL only)
+    tax_df = realized_to_tax_table(realized_gains_fifo(a["txs"]))
+    write_table(
+        tax_df, ctx.reports_dir, "au_cgt_fifo", ctx.cfg.output_format, dates=("acquired_date", "disposed_date")
+    )
+    return {"cgt": tax_df}
+
+
+CHART_FILES = ("equity_curve", "drawdown", "rolling_vol", "rolling_sharpe", "attribution")
+
+
+def _charts(ctx: RunContext, a: dict[str, Any]) -> dict[str, Any]:
+    cfg = ctx.cfg
+    equity, rolling_df = a["equity"], a["rolling"]
+    jobs = [
+        ChartJob("equity_curve", "equity_curve", pd.concat([equity, a["bench_equity"]], axis=1),
+                 "Equity curve vs benchmark"),
+        ChartJob("drawdown", "drawdown", equity, "Portfolio drawdown"),
+        ChartJob("rolling_vol", "rolling", rolling_df, "Rolling volatility", ("vol",)),
+        ChartJob("rolling_sharpe", "rolling", rolling_df, "Rolling Sharpe", ("sharpe",)),
+        ChartJob(
+            "attribution", "attribution", class_contributions(a["contrib"], cfg.base_currency, cfg.asset_classes),
+            "Cumulative contribution by asset class",
+        ),
+    ]
+    results = render_charts(
+        jobs, ctx.charts_dir, cfg.chart_max_points, cfg.chart_static_formats, cfg.max_workers,
+        dashboard_title="Portfolio dashboard",
+    )
+    errors = [f"{out}: {err}" for r in results for out, err in r.errors.items()]
+    if errors:
+        # Everything that could be written was; failing the stage keeps it out of the cache
+        # so the missing outputs are retried next run.
+        raise RuntimeError("; ".join(errors))
+    return {}
+
+
+def _pricing_params(ctx: RunContext) -> dict[str, Any]:
+    cfg = ctx.cfg
+    return {
+        "start": ctx.start,
+        "end": ctx.end,
+        "base_currency": cfg.base_currency,
+        "benchmark_ticker": cfg.benchmark_ticker,
+        "benchmarks": cfg.benchmarks,
+        "coinspot": [cfg.coinspot_history_url_template, cfg.coinspot_latest_url, cfg.coinspot_resolutions],
+    }
+
+
+def build_pipeline(ctx: RunContext) -> Pipeline:
+    cfg = ctx.cfg
+    reports, charts, processed = ctx.reports_dir, ctx.charts_dir, cfg.processed_dir
+    fmt = cfg.output_format
+
+    def tables(out_dir: Path, *names: str) -> list[Path]:
+        return [p for n in names for p in table_paths(out_dir, n, fmt)]
+
+    stages = [
+        *[
+            Stage(
+                f"ingest.{name}", _ingest(name), outputs=(f"raw.{name}",),
+                params=lambda c, name=name: file_digest(c.sources.get(name)),
+            )
+            for name in LOADERS
+        ],
+        Stage(
+            "normalize", _normalize, inputs=tuple(f"raw.{name}" for name in LOADERS), outputs=("txs",),
+            params=lambda c: {"symbol_map": cfg.symbol_map},
+        ),
+        Stage(
+            "export.transactions", _export_transactions, inputs=("txs",),
+            files=lambda c: tables(processed, "transactions_normalized"),
+            params=lambda c: {"format": fmt},
+        ),
+        Stage(
+            "holdings", _holdings, inputs=("txs",), outputs=("holdings",),
+            params=lambda c: {"start": c.start, "end": c.end},
+        ),
+        Stage(
+            "pricing", _pricing, inputs=("holdings",), outputs=("all_px",),
+            files=lambda c: [processed / "prices.parquet"], params=_pricing_params,
+        ),
+        Stage(
+            "valuation", _valuation, inputs=("holdings", "all_px"), outputs=("mv", "equity", "contrib"),
+            files=lambda c: [
+                processed / "market_values.parquet", processed / "weights.parquet",
+                processed / "contributions.parquet",
+                *tables(reports, "attribution_by_symbol", "attribution_by_class"),
+            ],
+            params=lambda c: {"base_currency": cfg.base_currency, "asset_classes": cfg.asset_classes, "format": fmt},
+        ),
+        Stage(
+            "stats", _stats, inputs=("txs", "holdings", "all_px", "mv", "equity"),
+            outputs=("bench_equity", "port_r", "rolling", "stats"),
+            files=lambda c: [
+                *tables(
+                    reports, "performance_summary", "mwr_by_holding", "benchmark_comparison",
+                    "returns_by_period", "equity_curve",
+                ),
+                reports / "rolling_metrics.parquet",
+            ],
+            params=lambda c: {
+                "benchmark_ticker": cfg.benchmark_ticker, "benchmarks": cfg.benchmarks,
+                "rolling_windows": cfg.rolling_windows, "format": fmt,
+            },
+        ),
+        Stage(
+            "cgt", _cgt, inputs=("txs",), outputs=("cgt",),
+            files=lambda c: tables(reports, "au_cgt_fifo"),
+            params=lambda c: {"format": fmt},
+        ),
+        Stage(
+            "charts", _charts, inputs=("equity", "bench_equity", "rolling", "contrib"),
+            files=lambda c: [
+                *(charts / f"{f}.{ext}" for f in CHART_FILES for ext in ("html", *cfg.chart_static_formats)),
+                charts / "dashboard.html", plotlyjs_path(charts),
+            ],
+            params=lambda c: {
+                "base_currency": cfg.base_currency, "asset_classes": cfg.asset_classes,
+                "max_points": cfg.chart_max_points, "static_formats": cfg.chart_static_formats,
+            },
+        ),
+    ]
+    return Pipeline(stages, cache_dir=processed / "stage_cache")
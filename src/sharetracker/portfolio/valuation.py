@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def market_values(holdings: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    # Date x symbol market values from one aligned multiply. Flat positions are worth zero
+    # even before a price exists; held-but-unpriced positions stay NaN.
+    symbols = [c for c in holdings.columns if c != "cash"]
+    qty = holdings[symbols].to_numpy(dtype=float)
+    px = prices.reindex(index=holdings.index, columns=symbols).to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        mv = np.where(qty == 0.0, 0.0, qty * px)
+    return pd.DataFrame(mv, index=holdings.index, columns=symbols)
+
+
+def equity_from_values(mv: pd.DataFrame, cash: pd.Series) -> pd.Series:
+    equity = cash.to_numpy(dtype=float) + mv.to_numpy().sum(axis=1)
+    return pd.Series(equity, index=mv.index, name="portfolio")
+
+
+def weights(mv: pd.DataFrame, equity: pd.Series) -> pd.DataFrame:
+    e = equity.to_numpy(dtype=float)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = np.where(e > 0, mv.to_numpy() / e, 0.0)
+    return pd.DataFrame(np.nan_to_num(w), index=mv.index, columns=mv.columns)
+
+
+def contributions(mv: pd.DataFrame, prices: pd.DataFrame, equity: pd.Series) -> pd.DataFrame:
+    # Contribution of each holding to the day's return: w_{t-1} * r_t, where r_t is the
+    # holding's price return. Cash earns nothing, so the row sum is the portfolio's
+    # price return before flows.
+    px = prices.reindex(index=mv.index, columns=mv.columns).to_numpy(dtype=float)
+    w = weights(mv, equity).to_numpy()
+    out = np.zeros_like(w)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = px[1:] / px[:-1] - 1.0
+    out[1:] = np.nan_to_num(w[:-1] * r, nan=0.0, posinf=0.0, neginf=0.0)
+    return pd.DataFrame(out, index=mv.index, columns=mv.columns)
+
+
+def asset_class(symbol: str, base_currency: str, overrides: dict[str, str] | None = None) -> str:
+    if overrides and symbol in overrides:
+        return overrides[symbol]
+    if symbol.endswith(".AX"):
+        return "ASX"
+    if symbol.endswith(f"-{base_currency.upper()}"):
+        return "Crypto"
+    return "Other"
+
+
+def attribution_by_symbol(
+    mv: pd.DataFrame,
+    contrib: pd.DataFrame,
+    w: pd.DataFrame,
+    base_currency: str,
+    overrides: dict[str, str] | None = None,
+) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "symbol": mv.columns,
+        "asset_class": [asset_class(s, base_currency, overrides) for s in mv.columns],
+        "avg_weight": w.to_numpy().mean(axis=0),
+        "end_weight": w.to_numpy()[-1] if len(w) else np.nan,
+        "end_market_value": np.nan_to_num(mv.to_numpy()[-1]) if len(mv) else np.nan,
+        "contribution": contrib.to_numpy().sum(axis=0),
+    })
+    return df.sort_values("contribution", ascending=False).reset_index(drop=True)
+
+
+def attribution_by_class(by_symbol: pd.DataFrame) -> pd.DataFrame:
+    cols = ["avg_weight", "end_weight", "end_market_value", "contribution"]
+    return by_symbol.groupby("asset_class", as_index=False)[cols].sum().sort_values(
+        "contribution", ascending=False
+    ).reset_index(drop=True)
+
+
+def class_contributions(contrib: pd.DataFrame, base_currency: str, overrides: dict[str, str] | None = None) -> pd.DataFrame:
+    classes = [asset_class(s, base_currency, overrides) for s in contrib.columns]
+    names, inv = np.unique(classes, return_inverse=True)
+    onehot = np.zeros((len(classes), len(names)))
+    onehot[np.arange(len(classes)), inv] = 1.0
+    return pd.DataFrame(contrib.to_numpy() @ onehot, index=contrib.index, columns=names)
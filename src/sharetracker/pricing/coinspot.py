@@ -8,6 +8,11 @@ import urllib.request
 
 import pandas as pd
 
+from sharetracker import profiling
+
+# Resolutions that can be materialised from stored ticks, mapped to pandas resample rules.
+RESAMPLE_RULES = {"1h": "1h", "1d": "1D"}
+
 
 def _extract_rows(payload: object) -> list[dict]:
     if isinstance(payload, dict):
@@ -86,7 +91,22 @@ def _payload_to_frame(payload: object) -> pd.DataFrame:
     return df
 
 
-def _payload_latest_to_frame(payload: object, symbol: str, start: str, end: str) -> pd.DataFrame:
+def resample_ohlc(ticks: pd.DataFrame, rule: str) -> pd.DataFrame:
+    if ticks.empty:
+        return pd.DataFrame(columns=["open", "high", "low", "close"], dtype=float)
+    bars = ticks["close"].resample(rule, label="left", closed="left").ohlc()
+    return bars.dropna(how="all")
+
+
+def merge_ticks(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    if existing.empty:
+        return new.sort_index()
+    df = pd.concat([existing[["close"]], new[["close"]]])
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+def _payload_latest_to_tick(payload: object, symbol: str, now: pd.Timestamp) -> pd.DataFrame:
+    # The latest endpoint is a single observation: one tick stamped at fetch time (UTC).
     if not isinstance(payload, dict):
         return pd.DataFrame()
     prices = payload.get("prices")
@@ -104,12 +124,13 @@ def _payload_latest_to_frame(payload: object, symbol: str, start: str, end: str)
     if price is None:
         return pd.DataFrame()
 
-    idx = pd.bdate_range(start=start, end=end)
-    if len(idx) == 0:
-        idx = pd.DatetimeIndex([pd.to_datetime(start)])
-    df = pd.DataFrame({"close": [price] * len(idx)}, index=idx)
-    df.index = pd.to_datetime(df.index).tz_localize(None)
-    return df
+    return pd.DataFrame({"close": [price]}, index=pd.DatetimeIndex([now], name="dt"))
+
+
+def _fetch_error(exc: OSError) -> str:
+    if isinstance(exc, urllib.error.HTTPError):
+        return str(exc.code)
+    return str(getattr(exc, "reason", None) or exc)
 
 
 @dataclass
@@ -120,14 +141,28 @@ class CoinspotPriceCache:
     api_key: str | None = None
     api_key_header: str = "key"
     timeout_seconds: int = 30
+    resolutions: tuple[str, ...] = ("1d",)
 
-    def cache_path(self, ticker: str) -> Path:
+    def __post_init__(self) -> None:
+        unknown = [r for r in self.resolutions if r not in RESAMPLE_RULES]
+        if unknown:
+            raise ValueError(f"Unsupported CoinSpot resolutions: {unknown} (expected {', '.join(RESAMPLE_RULES)})")
+
+    def cache_path(self, ticker: str, resolution: str = "ticks") -> Path:
         safe = ticker.replace("^", "_").replace("/", "_")
-        return self.cache_dir / f"prices_coinspot_{safe}.parquet"
+        return self.cache_dir / f"prices_coinspot_{safe}_{resolution}.parquet"
 
     def _coin_symbol(self, ticker: str) -> str:
         return ticker.split("-", 1)[0].upper()
 
+    def _get_json(self, req: urllib.request.Request) -> object:
+        profiling.count("network.requests")
+        with profiling.span("coinspot.fetch"):
+            with urllib.request.urlopen(req, timeout=self.timeout_seconds) as resp:
+                raw = resp.read()
+        profiling.count("network.bytes", len(raw))
+        return json.loads(raw)
+
     def _fetch_history(self, ticker: str) -> pd.DataFrame:
         coin = self._coin_symbol(ticker)
         url = self.history_url_template.format(symbol=coin, coin=coin, ticker=ticker)
@@ -135,49 +170,80 @@ class CoinspotPriceCache:
         if self.api_key:
             req.add_header(self.api_key_header, self.api_key)
         try:
-            with urllib.request.urlopen(req, timeout=self.timeout_seconds) as resp:
-                payload = json.load(resp)
-        except urllib.error.HTTPError as exc:
-            print(f"Warning: CoinSpot history fetch failed for {ticker} ({exc.code})")
+            payload = self._get_json(req)
+        except OSError as exc:  # HTTP errors, DNS failures, refused connections, timeouts
+            print(f"Warning: CoinSpot history fetch failed for {ticker} ({_fetch_error(exc)})")
             return pd.DataFrame()
         return _payload_to_frame(payload)
 
-    def _fetch_latest(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+    def _fetch_latest(self, ticker: str) -> pd.DataFrame:
         if not self.latest_url:
             return pd.DataFrame()
         req = urllib.request.Request(self.latest_url)
         if self.api_key:
             req.add_header(self.api_key_header, self.api_key)
         try:
-            with urllib.request.urlopen(req, timeout=self.timeout_seconds) as resp:
-                payload = json.load(resp)
-        except urllib.error.HTTPError as exc:
-            print(f"Warning: CoinSpot latest fetch failed ({exc.code})")
+            payload = self._get_json(req)
+        except OSError as exc:
+            print(f"Warning: CoinSpot latest fetch failed ({_fetch_error(exc)})")
             return pd.DataFrame()
-        return _payload_latest_to_frame(payload, self._coin_symbol(ticker), start, end)
-
-    def load_or_fetch(self, ticker: str, start: str, end: str) -> pd.Series:
+        now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        return _payload_latest_to_tick(payload, self._coin_symbol(ticker), now)
+
+    def _write_resolutions(self, ticker: str, ticks: pd.DataFrame, extra: str | None = None) -> None:
+        # Ticks are stored once; each resolution is pre-aggregated at write time so reads
+        # never have to resample.
+        with profiling.span("parquet.write"):
+            ticks.to_parquet(self.cache_path(ticker))
+            for res in {"1d", *self.resolutions, *([extra] if extra else [])}:
+                resample_ohlc(ticks, RESAMPLE_RULES[res]).to_parquet(self.cache_path(ticker, res))
+
+    def load_bars(
+        self, ticker: str, start: str, end: str, resolution: str = "1d", refresh: bool = False
+    ) -> pd.DataFrame:
+        # refresh=True fetches even when the cached bars already cover start..end.
+        if resolution not in RESAMPLE_RULES:
+            raise ValueError(f"Unsupported CoinSpot resolution: {resolution}")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        p = self.cache_path(ticker)
+        p = self.cache_path(ticker, resolution)
 
         if p.exists():
-            df = pd.read_parquet(p)
+            with profiling.span("parquet.read"):
+                df = pd.read_parquet(p)
         else:
             df = pd.DataFrame()
 
-        need_fetch = df.empty or df.index.min() > pd.to_datetime(start) or df.index.max() < pd.to_datetime(end)
+        need_fetch = (
+            refresh or df.empty or df.index.min() > pd.to_datetime(start) or df.index.max() < pd.to_datetime(end)
+        )
+        profiling.count("price_cache.miss" if need_fetch else "price_cache.hit")
 
         if need_fetch:
+            # Only real observations go into the tick store: the history series, plus the
+            # latest price as a single tick stamped now when latest_url is configured.
+            parts = [self._fetch_history(ticker)]
             if self.latest_url:
-                df = self._fetch_latest(ticker, start, end)
-            else:
-                df = self._fetch_history(ticker)
-            if df.empty:
+                parts.append(self._fetch_latest(ticker))
+            parts = [f for f in parts if not f.empty]
+            fresh = pd.concat(parts).sort_index() if parts else pd.DataFrame()
+            if fresh.empty and not df.empty:
+                print(f"Warning: CoinSpot refresh failed for {ticker}; using cached prices")
+            elif fresh.empty:
                 print(f"Warning: No CoinSpot data for ticker: {ticker}")
-                return pd.Series(name="close", dtype=float)
-            df.to_parquet(p)
-
-        s = df["close"].copy()
-        s.index = pd.to_datetime(s.index).tz_localize(None)
-        s = s.loc[(s.index >= pd.to_datetime(start)) & (s.index <= pd.to_datetime(end))]
-        return s
+                return pd.DataFrame(columns=["open", "high", "low", "close"], dtype=float)
+            else:
+                ticks_path = self.cache_path(ticker)
+                ticks = pd.read_parquet(ticks_path) if ticks_path.exists() else pd.DataFrame()
+                ticks = merge_ticks(ticks, fresh)
+                self._write_resolutions(ticker, ticks, extra=resolution)
+                df = pd.read_parquet(p)
+
+        df.index = pd.to_datetime(df.index).tz_localize(None)
+        # Bars are labelled by their period start, so include the whole of the end day.
+        end_excl = pd.to_datetime(end) + pd.Timedelta(days=1)
+        return df.loc[(df.index >= pd.to_datetime(start)) & (df.index < end_excl)]
+
+    def load_or_fetch(
+        self, ticker: str, start: str, end: str, resolution: str = "1d", refresh: bool = False
+    ) -> pd.Series:
+        return self.load_bars(ticker, start, end, resolution=resolution, refresh=refresh)["close"].copy()
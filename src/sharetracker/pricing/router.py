@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import pandas as pd
+
+from sharetracker.pricing.coinspot import CoinspotPriceCache
+from sharetracker.pricing.yahoo import PriceCache
+
+
+@dataclass
+class PriceRouter:
+    yahoo: PriceCache
+    coinspot: CoinspotPriceCache
+    base_currency: str = "AUD"
+
+    def is_coinspot(self, ticker: str) -> bool:
+        return ticker.endswith(f"-{self.base_currency.upper()}")
+
+    def load_many(self, tickers: list[str], start: str, end: str, refresh: bool = False) -> pd.DataFrame:
+        # Holdings and benchmark constituents share this path: crypto pairs go to CoinSpot,
+        # everything else is batched into a single Yahoo download for cache misses.
+        # refresh=True refetches every ticker regardless of what the caches hold.
+        tickers = list(dict.fromkeys(tickers))
+        prices: dict[str, pd.Series] = {}
+        for t in tickers:
+            if self.is_coinspot(t):
+                prices[t] = self.coinspot.load_or_fetch(t, start=start, end=end, refresh=refresh)
+        yahoo_tickers = [t for t in tickers if not self.is_coinspot(t)]
+        if yahoo_tickers:
+            prices.update(self.yahoo.load_or_fetch_many(yahoo_tickers, start=start, end=end, refresh=refresh))
+        return pd.DataFrame({t: prices[t] for t in tickers})
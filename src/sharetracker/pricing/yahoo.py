@@ -3,7 +3,15 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 import pandas as pd
-import yfinance as yf
+
+from sharetracker import profiling
+
+
+def _slice(df: pd.DataFrame, start: str, end: str) -> pd.Series:
+    s = df["close"].copy()
+    s.index = pd.to_datetime(s.index).tz_localize(None)
+    s = s.loc[(s.index >= pd.to_datetime(start)) & (s.index <= pd.to_datetime(end))]
+    return s
 
 
 @dataclass
@@ -14,34 +22,76 @@ class PriceCache:
         safe = ticker.replace("^", "_").replace("/", "_")
         return self.cache_dir / f"prices_{safe}.parquet"
 
-    def load_or_fetch(self, ticker: str, start: str, end: str) -> pd.Series:
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    def _read_cached(self, ticker: str) -> pd.DataFrame:
         p = self.cache_path(ticker)
+        if not p.exists():
+            return pd.DataFrame()
+        with profiling.span("parquet.read"):
+            return pd.read_parquet(p)
 
-        if p.exists():
-            df = pd.read_parquet(p)
-        else:
-            df = pd.DataFrame()
+    def _needs_fetch(self, df: pd.DataFrame, start: str, end: str) -> bool:
+        return df.empty or df.index.min() > pd.to_datetime(start) or df.index.max() < pd.to_datetime(end)
 
-        need_fetch = df.empty or df.index.min() > pd.to_datetime(start) or df.index.max() < pd.to_datetime(end)
+    def _download(self, tickers: list[str], start: str, end: str) -> dict[str, pd.DataFrame]:
+        # One Yahoo request for every ticker that missed the cache. yfinance is only
+        # imported here, so fully cached runs never load it.
+        import yfinance as yf
 
-        if need_fetch:
-            hist = yf.download(ticker, start=start, end=end, auto_adjust=True, progress=False)
-            if hist.empty:
-                print(f"Warning: No Yahoo Finance data for ticker: {ticker}")
-                return pd.Series(name="close", dtype=float)
-            close = hist["Close"]
+        profiling.count("network.requests")
+        # Yahoo's end is exclusive; ask for the day after so the end day itself is included.
+        end_excl = (pd.to_datetime(end) + pd.Timedelta(days=1)).date().isoformat()
+        with profiling.span("yahoo.download"):
+            hist = yf.download(tickers, start=start, end=end_excl, auto_adjust=True, progress=False)
+        # yfinance does not expose wire bytes; count the size of the frame it returned.
+        profiling.count("yahoo.frame_bytes", int(hist.memory_usage(deep=True).sum()))
+        out: dict[str, pd.DataFrame] = {}
+        if hist.empty:
+            return out
+        close = hist["Close"]
+        for ticker in tickers:
             if isinstance(close, pd.DataFrame):
                 if ticker in close.columns:
-                    close = close[ticker]
+                    col = close[ticker]
+                elif len(tickers) == 1:
+                    col = close.iloc[:, 0]
                 else:
-                    close = close.iloc[:, 0]
-            px = close.rename("close").to_frame()
+                    continue
+            else:
+                col = close
+            col = col.dropna()
+            if col.empty:
+                continue
+            px = col.rename("close").to_frame()
             px.index = pd.to_datetime(px.index).tz_localize(None)
-            df = px
-            df.to_parquet(p)
+            with profiling.span("parquet.write"):
+                px.to_parquet(self.cache_path(ticker))
+            out[ticker] = px
+        return out
+
+    def load_or_fetch_many(
+        self, tickers: list[str], start: str, end: str, refresh: bool = False
+    ) -> dict[str, pd.Series]:
+        # refresh=True downloads every ticker even when the cache already covers the range.
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        frames = {t: self._read_cached(t) for t in dict.fromkeys(tickers)}
+        missing = [t for t, df in frames.items() if refresh or self._needs_fetch(df, start, end)]
+        profiling.count("price_cache.hit", len(frames) - len(missing))
+        profiling.count("price_cache.miss", len(missing))
+        if missing:
+            fetched = self._download(missing, start, end)
+            for t in missing:
+                if t in fetched:
+                    frames[t] = fetched[t]
+                elif not frames[t].empty:
+                    print(f"Warning: Yahoo Finance refresh failed for {t}; using cached prices")
+                else:
+                    print(f"Warning: No Yahoo Finance data for ticker: {t}")
+                    frames[t] = pd.DataFrame()
+
+        return {
+            t: pd.Series(name="close", dtype=float) if df.empty else _slice(df, start, end)
+            for t, df in frames.items()
+        }
 
-        s = df["close"].copy()
-        s.index = pd.to_datetime(s.index).tz_localize(None)
-        s = s.loc[(s.index >= pd.to_datetime(start)) & (s.index <= pd.to_datetime(end))]
-        return s
+    def load_or_fetch(self, ticker: str, start: str, end: str, refresh: bool = False) -> pd.Series:
+        return self.load_or_fetch_many([ticker], start, end, refresh=refresh)[ticker]
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    start_s: float
+    wall_s: float
+    cpu_s: float
+    peak_bytes: int
+    thread: int
+
+
+@dataclass
+class Profiler:
+    spans: list[SpanRecord] = field(default_factory=list)
+    counters: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    _t0: float = field(default_factory=time.perf_counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _local: threading.local = field(default_factory=threading.local)
+
+    @property
+    def _peaks(self) -> list[int]:
+        if not hasattr(self._local, "peaks"):
+            self._local.peaks = []
+        return self._local.peaks
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        # tracemalloc has a single process-wide peak counter, so nested spans fold their peak
+        # into the enclosing span before resetting it. The stack is per thread, so a span in
+        # another thread would reset the counter without reaching its parent; that is why
+        # `run --profile` executes stages inline on the calling thread.
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+        start = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            cpu = time.process_time() - cpu
+            peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            with self._lock:
+                self.spans.append(
+                    SpanRecord(name, start - self._t0, wall, cpu, peak, threading.get_ident())
+                )
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def to_dict(self) -> dict:
+        return {
+            "spans": [asdict(s) for s in self.spans],
+            "counters": dict(self.counters),
+        }
+
+    def chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = [{
+            "name": s.name,
+            "ph": "X",
+            "ts": s.start_s * 1e6,
+            "dur": s.wall_s * 1e6,
+            "pid": pid,
+            "tid": s.thread,
+            "args": {"cpu_s": s.cpu_s, "peak_bytes": s.peak_bytes},
+        } for s in self.spans]
+        end_us = max((e["ts"] + e["dur"] for e in events), default=0.0)
+        events += [{"name": k, "ph": "C", "ts": end_us, "pid": pid, "args": {"value": v}}
+                   for k, v in sorted(self.counters.items())]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, out_dir: Path) -> tuple[Path, Path]:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        trace = out_dir / "profile.json"
+        chrome = out_dir / "profile.chrome.json"
+        trace.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        chrome.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+        return trace, chrome
+
+    def print_summary(self) -> None:
+        from rich.console import Console
+        from rich.table import Table
+
+        # Repeated spans (e.g. one parquet read per ticker) are folded into one row.
+        grouped: dict[str, list[SpanRecord]] = {}
+        for s in sorted(self.spans, key=lambda x: x.start_s):
+            grouped.setdefault(s.name, []).append(s)
+
+        table = Table(title="Profile")
+        table.add_column("span")
+        table.add_column("calls", justify="right")
+        table.add_column("wall s", justify="right")
+        table.add_column("cpu s", justify="right")
+        table.add_column("peak MiB", justify="right")
+        for name, recs in grouped.items():
+            table.add_row(
+                name,
+                str(len(recs)),
+                f"{sum(r.wall_s for r in recs):.3f}",
+                f"{sum(r.cpu_s for r in recs):.3f}",
+                f"{max(r.peak_bytes for r in recs) / 2**20:.1f}",
+            )
+        counters = Table(title="Counters")
+        counters.add_column("counter")
+        counters.add_column("value", justify="right")
+        for k, v in sorted(self.counters.items()):
+            counters.add_row(k, f"{v:g}")
+        console = Console()
+        console.print(table)
+        if self.counters:
+            console.print(counters)
+
+
+# Module-level hooks are no-ops unless a profiler is active, so instrumented hot paths pay
+# one global lookup when profiling is off.
+_ACTIVE: Profiler | None = None
+
+
+def enable() -> Profiler:
+    global _ACTIVE
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _ACTIVE = Profiler()
+    return _ACTIVE
+
+
+def disable() -> Profiler | None:
+    global _ACTIVE
+    prof, _ACTIVE = _ACTIVE, None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return prof
+
+
+def count(name: str, n: float = 1) -> None:
+    if _ACTIVE is not None:
+        _ACTIVE.count(name, n)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    if _ACTIVE is None:
+        yield
+        return
+    with _ACTIVE.span(name):
+        yield
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Bumped whenever a column is renamed, removed or changes type in any written table.
+SCHEMA_VERSION = 1
+SCHEMA_KEY = b"sharetracker.schema_version"
+TABLE_KEY = b"sharetracker.table"
+
+# Small row groups keep min/max statistics useful for filtered reads on large tables.
+ROW_GROUP_SIZE = 64_000
+
+
+def table_paths(out_dir: Path, name: str, fmt: str) -> list[Path]:
+    exts = {"csv": ["csv"], "parquet": ["parquet"], "both": ["parquet", "csv"]}[fmt]
+    return [out_dir / f"{name}.{ext}" for ext in exts]
+
+
+def write_parquet(df: pd.DataFrame, path: Path, name: str, index: bool = False) -> Path:
+    table = pa.Table.from_pandas(df, preserve_index=index)
+    meta = dict(table.schema.metadata or {})
+    meta[SCHEMA_KEY] = str(SCHEMA_VERSION).encode()
+    meta[TABLE_KEY] = name.encode()
+    pq.write_table(table.replace_schema_metadata(meta), path, row_group_size=ROW_GROUP_SIZE)
+    return path
+
+
+def write_table(
+    df: pd.DataFrame,
+    out_dir: Path,
+    name: str,
+    fmt: str,
+    index: bool = False,
+    dates: tuple[str, ...] = (),
+) -> list[Path]:
+    # `dates` are ISO-string columns stored as real dates in parquet; CSV keeps the strings.
+    paths = table_paths(out_dir, name, fmt)
+    for p in paths:
+        if p.suffix == ".csv":
+            df.to_csv(p, index=index)
+        else:
+            typed = df.assign(**{c: pd.to_datetime(df[c]).dt.date for c in dates if c in df.columns})
+            write_parquet(typed, p, name, index=index)
+    return paths
+
+
+def schema_version(path: Path) -> int | None:
+    meta = pq.read_schema(path).metadata or {}
+    v = meta.get(SCHEMA_KEY)
+    return int(v) if v is not None else None
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from sharetracker.reporting.export import SCHEMA_VERSION, schema_version
+
+# Tables written under <outputs_dir>/reports and processed_dir respectively.
+REPORTS = (
+    "performance_summary", "mwr_by_holding", "benchmark_comparison", "returns_by_period",
+    "equity_curve", "au_cgt_fifo", "attribution_by_symbol", "attribution_by_class", "rolling_metrics",
+)
+PROCESSED = ("transactions_normalized", "prices", "market_values", "weights", "contributions")
+
+_FS = pafs.LocalFileSystem(use_mmap=True)
+
+
+def _ts(value: str) -> Any:
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def _whole_day(value: str) -> bool:
+    # A bare date as an end bound covers that whole day, not just its midnight.
+    ts = pd.Timestamp(value)
+    return ":" not in str(value) and ts == ts.normalize()
+
+
+@dataclass
+class Results:
+    # Read-only view over parquet outputs (outputs.format: parquet or both). Files are
+    # memory-mapped and filters are pushed down to row groups, so only matching rows are read.
+    outputs_dir: Path
+    processed_dir: Path | None = None
+
+    def path(self, name: str) -> Path:
+        if name in REPORTS:
+            return self.outputs_dir / "reports" / f"{name}.parquet"
+        if name in PROCESSED:
+            if self.processed_dir is None:
+                raise ValueError(f"{name} lives in processed_dir; pass processed_dir to results.open()")
+            return self.processed_dir / f"{name}.parquet"
+        raise ValueError(f"Unknown table: {name} (known: {', '.join(REPORTS + PROCESSED)})")
+
+    def tables(self) -> list[str]:
+        names = list(REPORTS) + (list(PROCESSED) if self.processed_dir else [])
+        return [n for n in names if self.path(n).exists()]
+
+    def dataset(self, name: str) -> ds.Dataset:
+        p = self.path(name)
+        if not p.exists():
+            raise FileNotFoundError(f"{p} not found; run with outputs.format: parquet (or both)")
+        version = schema_version(p)
+        if version is not None and version > SCHEMA_VERSION:
+            raise ValueError(f"{p} has schema version {version}; this sharetracker reads up to {SCHEMA_VERSION}")
+        return ds.dataset(str(p), format="parquet", filesystem=_FS)
+
+    def read(self, name: str, columns: list[str] | None = None, filter: ds.Expression | None = None) -> pd.DataFrame:
+        return self.dataset(name).to_table(columns=columns, filter=filter).to_pandas()
+
+    def cgt(self, fy: int | None = None, symbol: str | None = None) -> pd.DataFrame:
+        f = None
+        if fy is not None:
+            f = ds.field("fy") == int(fy)
+        if symbol is not None:
+            f = (ds.field("symbol") == symbol) if f is None else f & (ds.field("symbol") == symbol)
+        return self.read("au_cgt_fifo", filter=f)
+
+    def equity(self, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+        return self._between("equity_curve", "date", start, end, _ts)
+
+    def transactions(
+        self, start: str | None = None, end: str | None = None, symbol: str | None = None
+    ) -> pd.DataFrame:
+        df = self._between("transactions_normalized", "dt", start, end, _ts, symbol=symbol)
+        return df.reset_index(drop=True)
+
+    def stats(self) -> dict[str, Any]:
+        rows = self.read("performance_summary").to_dict(orient="records")
+        return rows[0] if rows else {}
+
+    def _between(
+        self, name: str, col: str, start: str | None, end: str | None, conv, symbol: str | None = None
+    ) -> pd.DataFrame:
+        f = None
+        if start is not None:
+            f = ds.field(col) >= conv(start)
+        if end is not None:
+            if _whole_day(end):
+                e = ds.field(col) < conv((pd.Timestamp(end) + pd.Timedelta(days=1)).isoformat())
+            else:
+                e = ds.field(col) <= conv(end)
+            f = e if f is None else f & e
+        if symbol is not None:
+            s = ds.field("symbol") == symbol
+            f = s if f is None else f & s
+        return self.read(name, filter=f)
+
+
+def open(outputs_dir: str | Path, processed_dir: str | Path | None = None) -> Results:
+    return Results(Path(outputs_dir), Path(processed_dir) if processed_dir is not None else None)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+import json
+import math
+import os
+import threading
+import time
+
+import pandas as pd
+
+from sharetracker.pipeline.graph import Pipeline, StageResult
+from sharetracker.pipeline.stages import RunContext, build_pipeline
+
+# Artifacts the API answers from; kept in memory between refreshes.
+SERVED = ("holdings", "mv", "equity", "bench_equity", "stats", "cgt")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    artifacts: dict[str, Any]
+    refreshed_at: str
+    results: list[StageResult] = field(default_factory=list)
+
+
+def _signature(sources: dict[str, str | None]) -> dict[str, tuple[int, int] | None]:
+    out: dict[str, tuple[int, int] | None] = {}
+    for name, path in sources.items():
+        try:
+            st = os.stat(path) if path else None
+        except FileNotFoundError:
+            st = None
+        out[name] = (st.st_mtime_ns, st.st_size) if st else None
+    return out
+
+
+def _clean(v: Any) -> Any:
+    if isinstance(v, float) and not math.isfinite(v):
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.date().isoformat()
+    if hasattr(v, "item"):  # numpy scalar
+        return _clean(v.item())
+    return v
+
+
+def _records(df: pd.DataFrame) -> list[dict[str, Any]]:
+    return [{k: _clean(v) for k, v in row.items()} for row in df.to_dict(orient="records")]
+
+
+class Service:
+    def __init__(self, ctx: RunContext, fixed_end: bool, poll_seconds: float, price_refresh_minutes: float):
+        self.ctx = ctx
+        self.fixed_end = fixed_end
+        self.poll_seconds = poll_seconds
+        self.price_refresh_seconds = price_refresh_minutes * 60
+        self.pipeline: Pipeline = build_pipeline(ctx)
+        self.snapshot: Snapshot | None = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sig = _signature(ctx.sources)
+        self._last_priced = 0.0
+
+    def refresh(self, reprice: bool = False) -> Snapshot:
+        # Stage keys skip everything whose inputs are unchanged; only stages that ran
+        # replace the in-memory artifacts. Readers keep using the old snapshot until the
+        # new one is swapped in.
+        with self._refresh_lock:
+            if not self.fixed_end:
+                self.ctx = replace(self.ctx, end=datetime.today().date().isoformat())
+            if reprice or self.snapshot is None:
+                # Stamped before running, so a failing reprice waits a full interval before
+                # the watcher tries again instead of retrying on every poll.
+                self._last_priced = time.monotonic()
+            artifacts, results = self.pipeline.run(
+                replace(self.ctx, refresh_prices=reprice),
+                from_stage="pricing" if reprice else None,
+                max_workers=self.ctx.cfg.max_workers,
+            )
+            merged = {} if self.snapshot is None else dict(self.snapshot.artifacts)
+            merged.update({k: v for k, v in artifacts.items() if k in SERVED})
+            missing = tuple(n for n in SERVED if n not in merged)
+            if missing:
+                merged.update(self.pipeline.load(missing))
+            self.snapshot = Snapshot(merged, datetime.now().isoformat(timespec="seconds"), results)
+            ran = [r.name for r in results if r.status == "ran"]
+            for r in results:
+                if r.error:
+                    print(f"Warning: stage {r.name} {r.status}: {r.error}")
+            print(f"[{self.snapshot.refreshed_at}] refreshed; ran: {', '.join(ran) or 'nothing'}")
+            return self.snapshot
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            sig = _signature(self.ctx.sources)
+            changed = sig != self._sig
+            due = self.price_refresh_seconds > 0 and time.monotonic() - self._last_priced >= self.price_refresh_seconds
+            if not (changed or due):
+                continue
+            self._sig = sig
+            try:
+                self.refresh(reprice=due)
+            except Exception as exc:  # keep serving the last good snapshot
+                print(f"Warning: refresh failed: {exc}")
+
+    def start_watcher(self) -> threading.Thread:
+        t = threading.Thread(target=self._watch, name="sharetracker-watch", daemon=True)
+        t.start()
+        return t
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # --- queries, all answered from the current snapshot ---
+
+    def holdings(self, date: str | None) -> dict[str, Any]:
+        a = self.snapshot.artifacts
+        holdings, mv, equity = a["holdings"], a["mv"], a["equity"]
+        asof = holdings.index[-1] if date is None else pd.to_datetime(date)
+        i = holdings.index.searchsorted(asof, side="right") - 1
+        if i < 0:
+            raise ValueError(f"No holdings on or before {date}")
+        day = holdings.index[i]
+        qty = holdings.iloc[i].drop("cash")
+        values = mv.iloc[i]
+        return {
+            "date": _clean(day),
+            "cash": _clean(holdings["cash"].iloc[i]),
+            "equity": _clean(equity.iloc[i]),
+            "positions": [
+                {"symbol": s, "quantity": _clean(q), "market_value": _clean(values.get(s))}
+                for s, q in qty.items() if q != 0
+            ],
+        }
+
+    def equity(self, start: str | None, end: str | None) -> dict[str, Any]:
+        a = self.snapshot.artifacts
+        curve = pd.concat([a["equity"], a["bench_equity"]], axis=1).loc[start:end]
+        return {
+            "dates": [d.date().isoformat() for d in curve.index],
+            **{str(c): [_clean(v) for v in curve[c].tolist()] for c in curve.columns},
+        }
+
+    def stats(self) -> dict[str, Any]:
+        rows = _records(self.snapshot.artifacts["stats"])
+        return rows[0] if rows else {}
+
+    def cgt(self, fy: str | None, symbol: str | None) -> list[dict[str, Any]]:
+        df = self.snapshot.artifacts["cgt"]
+        if df.empty:
+            return []
+        if fy is not None:
+            # Accepts 2025 as well as FY2025, the label used in returns_by_period.
+            fy = fy.strip()
+            df = df[df["fy"] == int(fy[2:] if fy[:2].upper() == "FY" else fy)]
+        if symbol is not None:
+            df = df[df["symbol"] == symbol]
+        return _records(df)
+
+    def status(self) -> dict[str, Any]:
+        snap = self.snapshot
+        return {
+            "refreshed_at": snap.refreshed_at,
+            "start": self.ctx.start,
+            "end": self.ctx.end,
+            "stages": [{"name": r.name, "status": r.status, "seconds": round(r.seconds, 4)} for r in snap.results],
+        }
+
+
+def _handler(service: Service) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, payload: Any) -> None:
+            body = json.dumps(payload, allow_nan=False).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            routes = {
+                "/holdings": lambda: service.holdings(q.get("date")),
+                "/equity": lambda: service.equity(q.get("start"), q.get("end")),
+                "/stats": service.stats,
+                "/cgt": lambda: service.cgt(q.get("fy"), q.get("symbol")),
+                "/status": service.status,
+            }
+            route = routes.get(url.path.rstrip("/") or "/")
+            if route is None:
+                self._send(404, {"error": f"Unknown path: {url.path}", "paths": sorted(routes)})
+                return
+            try:
+                self._send(200, route())
+            except (KeyError, ValueError) as exc:
+                self._send(400, {"error": str(exc)})
+
+        def do_POST(self) -> None:
+            if urlparse(self.path).path.rstrip("/") != "/refresh":
+                self._send(404, {"error": f"Unknown path: {self.path}"})
+                return
+            try:
+                service.refresh(reprice=True)
+            except Exception as exc:  # the previous snapshot keeps being served
+                self._send(500, {"error": f"{type(exc).__name__}: {exc}"})
+                return
+            self._send(200, service.status())
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def serve(service: Service, host: str, port: int) -> None:
+    service.refresh()
+    service.start_watcher()
+    server = ThreadingHTTPServer((host, port), _handler(service))
+    print(f"Serving on http://{host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
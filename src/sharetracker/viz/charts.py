@@ -1,19 +1,224 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from html import escape
+from importlib.metadata import version
+import multiprocessing
+import os
 from pathlib import Path
+import numpy as np
 import pandas as pd
-import plotly.express as px
 
+from sharetracker import profiling
 
-def save_equity_curve_chart(df: pd.DataFrame, out_html: Path, title: str) -> None:
-    fig = px.line(df, x=df.index, y=df.columns, title=title)
+
+def _px():
+    # plotly is only imported once a chart is actually written.
+    import plotly.express as px
+    return px
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: indices of n_out points that keep the visual shape
+    # (peaks, troughs, first and last point) of the series.
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    every = (n - 2) / (n_out - 2)
+    edges = np.floor(np.arange(n_out - 1) * every).astype(np.int64) + 1
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample(df: pd.DataFrame, max_points: int | None) -> pd.DataFrame:
+    # Each column is reduced to at most max_points with LTTB; rows kept by any column are
+    # kept for all, so the series still share one x axis.
+    if not max_points or len(df) <= max_points:
+        return df
+    if isinstance(df.index, pd.DatetimeIndex):
+        x = df.index.asi8.astype(float)
+    else:
+        x = np.arange(len(df), dtype=float)
+    keep = np.zeros(len(df), dtype=bool)
+    for c in df.columns:
+        y = df[c].to_numpy(dtype=float)
+        valid = np.flatnonzero(np.isfinite(y))
+        if len(valid):
+            keep[valid[lttb(x[valid], y[valid], max_points)]] = True
+    return df[keep]
+
+
+def plotlyjs_path(out_dir: Path) -> Path:
+    # Versioned so a plotly upgrade never pairs new figures with an old bundle. Reads the
+    # installed version from metadata, so this does not import plotly.
+    return out_dir / f"plotly-{version('plotly')}.min.js"
+
+
+def ensure_plotlyjs(out_dir: Path) -> Path:
+    # One plotly.js bundle per output directory, shared by every chart.
+    from plotly.offline import get_plotlyjs
+
+    path = plotlyjs_path(out_dir)
+    if not path.exists():
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path.write_text(get_plotlyjs(), encoding="utf-8")
+    return path
+
+
+def save_figure(fig, out_html: Path) -> None:
     out_html.parent.mkdir(parents=True, exist_ok=True)
-    fig.write_html(str(out_html))
+    asset = ensure_plotlyjs(out_html.parent)
+    with profiling.span(f"charts.write_html:{out_html.name}"):
+        fig.write_html(str(out_html), include_plotlyjs=asset.name)
+
+
+def equity_curve_figure(df: pd.DataFrame, title: str, max_points: int | None = None):
+    df = downsample(df, max_points)
+    return _px().line(df, x=df.index, y=df.columns, title=title)
 
 
-def save_drawdown_chart(equity: pd.Series, out_html: Path, title: str) -> None:
+def drawdown_figure(equity: pd.Series, title: str, max_points: int | None = None):
+    # Drawdown is computed on the full series before downsampling.
     peak = equity.cummax()
-    dd = equity / peak - 1.0
-    fig = px.area(dd, title=title)
+    dd = (equity / peak - 1.0).to_frame()
+    return _px().area(downsample(dd, max_points), title=title)
+
+
+def rolling_figure(rolling: pd.DataFrame, metric: str, title: str, max_points: int | None = None):
+    cols = [c for c in rolling.columns if c.startswith(f"{metric}_") and c.endswith("d")]
+    df = downsample(rolling[cols].rename(columns=lambda c: c[len(metric) + 1:]), max_points)
+    return _px().line(df, x=df.index, y=df.columns, title=title)
+
+
+def attribution_figure(class_contrib: pd.DataFrame, title: str, max_points: int | None = None):
+    df = downsample(class_contrib.cumsum(), max_points)
+    return _px().line(df, x=df.index, y=df.columns, title=title)
+
+
+def save_equity_curve_chart(df: pd.DataFrame, out_html: Path, title: str, max_points: int | None = None) -> None:
+    save_figure(equity_curve_figure(df, title, max_points), out_html)
+
+
+def save_drawdown_chart(equity: pd.Series, out_html: Path, title: str, max_points: int | None = None) -> None:
+    save_figure(drawdown_figure(equity, title, max_points), out_html)
+
+
+def _dashboard_html(fragments: list[str], asset: Path, title: str) -> str:
+    body = "\n".join(f'<div class="chart">{f}</div>' for f in fragments)
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{escape(title)}</title>\n<script src=\"{asset.name}\"></script>\n</head>\n"
+        f"<body>\n<h1>{escape(title)}</h1>\n{body}\n</body>\n</html>\n"
+    )
+
+
+def save_dashboard(fragments: list[str], out_html: Path, title: str) -> None:
+    # All chart fragments in one page, loading the shared plotly.js once.
     out_html.parent.mkdir(parents=True, exist_ok=True)
-    fig.write_html(str(out_html))
+    asset = ensure_plotlyjs(out_html.parent)
+    with profiling.span(f"charts.write_html:{out_html.name}"):
+        out_html.write_text(_dashboard_html(fragments, asset, title), encoding="utf-8")
+
+
+STATIC_FORMATS = ("png", "svg", "pdf")
+
+FIGURES = {
+    "equity_curve": equity_curve_figure,
+    "drawdown": drawdown_figure,
+    "rolling": rolling_figure,
+    "attribution": attribution_figure,
+}
+
+
+def _error(exc: Exception) -> str:
+    return f"{type(exc).__name__}: {' '.join(str(exc).split())}"
+
+
+@dataclass
+class ChartJob:
+    name: str  # output file stem
+    kind: str  # key into FIGURES
+    data: pd.DataFrame | pd.Series
+    title: str
+    args: tuple = ()  # extra positional args after data, e.g. the rolling metric
+
+
+@dataclass
+class ChartResult:
+    name: str
+    fragment: str | None = None
+    files: list[Path] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+def render_chart(job: ChartJob, out_dir: Path, max_points: int | None, formats: tuple[str, ...]) -> ChartResult:
+    # Builds the figure once and writes every output for it. Each output fails on its own
+    # (e.g. PNG export without kaleido), so the HTML and the other formats still land.
+    res = ChartResult(job.name)
+    try:
+        fig = FIGURES[job.kind](job.data, *job.args, job.title, max_points)
+        res.fragment = fig.to_html(full_html=False, include_plotlyjs=False)
+    except Exception as exc:
+        res.errors[job.name] = _error(exc)
+        return res
+    for ext in ("html",) + tuple(formats):
+        path = out_dir / f"{job.name}.{ext}"
+        try:
+            if ext == "html":
+                save_figure(fig, path)
+            else:
+                # Static export goes through kaleido.
+                fig.write_image(str(path), format=ext)
+            res.files.append(path)
+        except Exception as exc:
+            res.errors[path.name] = _error(exc)
+    return res
+
+
+def render_charts(
+    jobs: list[ChartJob],
+    out_dir: Path,
+    max_points: int | None = None,
+    formats: tuple[str, ...] = (),
+    max_workers: int = 1,
+    dashboard_title: str | None = None,
+) -> list[ChartResult]:
+    # Charts render in a process pool (figure building and kaleido export are CPU-bound and
+    # hold the GIL); with max_workers <= 1 they render in-process.
+    unknown = [f for f in formats if f not in STATIC_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown static chart formats: {unknown} (expected {', '.join(STATIC_FORMATS)})")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ensure_plotlyjs(out_dir)  # before any worker starts, so they never race on it
+
+    workers = min(max_workers, len(jobs), os.cpu_count() or 1)
+    if workers > 1:
+        # Called from a pipeline thread, so never fork this multithreaded process; workers
+        # come from a forkserver (or spawn where that is unavailable) and import plotly.
+        methods = multiprocessing.get_all_start_methods()
+        mp_context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+            futures = [pool.submit(render_chart, j, out_dir, max_points, formats) for j in jobs]
+            results = []
+            for job, fut in zip(jobs, futures):
+                try:
+                    results.append(fut.result())
+                except Exception as exc:  # worker crashed or the job did not pickle
+                    results.append(ChartResult(job.name, errors={job.name: _error(exc)}))
+    else:
+        results = [render_chart(j, out_dir, max_points, formats) for j in jobs]
+
+    if dashboard_title is not None:
+        fragments = [r.fragment for r in results if r.fragment is not None]
+        save_dashboard(fragments, out_dir / "dashboard.html", dashboard_title)
+    return results
@@ -0,0 +1,19 @@
+import json
+
+from typer.testing import CliRunner
+
+from run_benchmarks import app
+
+
+def test_benchmarks_run_on_tiny_scale(tmp_path):
+    # Runs the whole harness (loaders, holdings, price cache, router, charts) so a
+    # signature change in any of them breaks here rather than in a manual bench run.
+    out = tmp_path / "result.json"
+    res = CliRunner().invoke(app, [
+        "--rows", "200", "--symbols", "3", "--repeat", "1",
+        "--workdir", str(tmp_path), "--out", str(out),
+    ])
+    assert res.exit_code == 0, res.output
+    results = json.loads(out.read_text(encoding="utf-8"))["results"]
+    assert "price_router.synthetic" in results
+    assert "charts.equity_curve" in results
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from sharetracker import results
+from sharetracker.reporting.export import write_table
+
+
+def test_transactions_end_date_includes_intraday_trades(tmp_path):
+    df = pd.DataFrame({
+        "dt": pd.to_datetime(["2025-05-12 09:00", "2025-05-13 12:21", "2025-05-14 00:00"]),
+        "symbol": ["BCAU-AUD", "BCAU-AUD", "BCAU-AUD"],
+        "quantity": [1.0, 2.0, 3.0],
+    })
+    write_table(df, tmp_path, "transactions_normalized", "parquet")
+    r = results.open(tmp_path / "outputs", processed_dir=tmp_path)
+
+    day = r.transactions("2025-05-13", "2025-05-13", symbol="BCAU-AUD")
+    assert day["quantity"].tolist() == [2.0]
+    # An explicit time is still an inclusive instant.
+    assert r.transactions("2025-05-12", "2025-05-13 12:00")["quantity"].tolist() == [1.0]